@@ -0,0 +1,28 @@
+"""add movie release_date/id index
+
+Revision ID: 3f1c9a7d2b64
+Revises: 756c8dd30192
+Create Date: 2026-10-15 09:12:41.512309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f1c9a7d2b64'
+down_revision: Union[str, Sequence[str], None] = '756c8dd30192'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_movie_release_id', 'movie', ['release_date', 'id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movie_release_id', table_name='movie', if_exists=True)
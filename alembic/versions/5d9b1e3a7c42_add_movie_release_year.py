@@ -0,0 +1,37 @@
+"""add indexed movie.release_year
+
+Revision ID: 5d9b1e3a7c42
+Revises: e7a3f5c19b28
+Create Date: 2026-10-15 12:26:08.731954
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9b1e3a7c42'
+down_revision: Union[str, Sequence[str], None] = 'e7a3f5c19b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite has no ADD COLUMN IF NOT EXISTS, and create_all may already have added it
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('movie')}
+    if 'release_year' not in columns:
+        op.add_column('movie', sa.Column('release_year', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE movie SET release_year = CAST(substr(release_date, 1, 4) AS INTEGER) "
+        "WHERE release_date IS NOT NULL AND release_date != ''"
+    )
+    op.create_index('ix_movie_release_year', 'movie', ['release_year'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movie_release_year', table_name='movie', if_exists=True)
+    op.drop_column('movie', 'release_year')
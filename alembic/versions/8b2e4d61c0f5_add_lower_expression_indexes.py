@@ -0,0 +1,32 @@
+"""add lower() expression indexes for exact-match filters
+
+Revision ID: 8b2e4d61c0f5
+Revises: 3f1c9a7d2b64
+Create Date: 2026-10-15 10:03:17.284915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4d61c0f5'
+down_revision: Union[str, Sequence[str], None] = '3f1c9a7d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_genre_name_lower', 'genre', [sa.text('lower(name)')], unique=False, if_not_exists=True)
+    op.create_index('ix_movie_status_lower', 'movie', [sa.text('lower(status)')], unique=False, if_not_exists=True)
+    op.create_index('ix_movie_language_lower', 'movie', [sa.text('lower(language)')], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movie_language_lower', table_name='movie', if_exists=True)
+    op.drop_index('ix_movie_status_lower', table_name='movie', if_exists=True)
+    op.drop_index('ix_genre_name_lower', table_name='genre', if_exists=True)
@@ -0,0 +1,28 @@
+"""add lower(title) expression index for prefix search
+
+Revision ID: a2f6c8d04e19
+Revises: 5d9b1e3a7c42
+Create Date: 2026-10-15 12:58:44.102376
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2f6c8d04e19'
+down_revision: Union[str, Sequence[str], None] = '5d9b1e3a7c42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_movie_lower_title', 'movie', [sa.text('lower(title)')], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_movie_lower_title', table_name='movie', if_exists=True)
@@ -0,0 +1,41 @@
+"""add movie_fts full-text index and its sync triggers
+
+Revision ID: b8e1c6f2d093
+Revises: f3b7d9a1c5e2
+Create Date: 2026-10-15 16:42:10.274518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from db.connect import FTS_DDL, FTS_REBUILD
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e1c6f2d093'
+down_revision: Union[str, Sequence[str], None] = 'f3b7d9a1c5e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FTS5 is SQLite only, other databases keep using the ILIKE title search
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in FTS_DDL:
+        op.execute(statement)
+    # Also covers databases where init_db() already created the table
+    op.execute(FTS_REBUILD)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TRIGGER IF EXISTS movie_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS movie_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS movie_fts_ai")
+    op.execute("DROP TABLE IF EXISTS movie_fts")
@@ -0,0 +1,34 @@
+"""add movie_credits_cache table
+
+Revision ID: c4d8e2a9f713
+Revises: 8b2e4d61c0f5
+Create Date: 2026-10-15 11:26:52.907413
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e2a9f713'
+down_revision: Union[str, Sequence[str], None] = '8b2e4d61c0f5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'movie_credits_cache',
+        sa.Column('movie_id', sa.Integer(), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('movie_id'),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('movie_credits_cache', if_exists=True)
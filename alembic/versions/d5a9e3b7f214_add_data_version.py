@@ -0,0 +1,34 @@
+"""add data_version table
+
+Revision ID: d5a9e3b7f214
+Revises: b8e1c6f2d093
+Create Date: 2026-10-15 17:20:48.631907
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a9e3b7f214'
+down_revision: Union[str, Sequence[str], None] = 'b8e1c6f2d093'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'data_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('data_version', if_exists=True)
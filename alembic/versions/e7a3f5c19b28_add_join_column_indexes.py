@@ -0,0 +1,32 @@
+"""add indexes on credit and movie_genre join columns
+
+Revision ID: e7a3f5c19b28
+Revises: c4d8e2a9f713
+Create Date: 2026-10-15 11:12:40.518263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3f5c19b28'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e2a9f713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_credit_movie_id', 'credit', ['movie_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_credit_person_movie', 'credit', ['person_id', 'movie_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_moviegenre_movie_id', 'movie_genre', ['movie_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_moviegenre_movie_id', table_name='movie_genre', if_exists=True)
+    op.drop_index('ix_credit_person_movie', table_name='credit', if_exists=True)
+    op.drop_index('ix_credit_movie_id', table_name='credit', if_exists=True)
@@ -0,0 +1,34 @@
+"""add response_etag table
+
+Revision ID: f3b7d9a1c5e2
+Revises: a2f6c8d04e19
+Create Date: 2026-10-15 14:07:31.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b7d9a1c5e2'
+down_revision: Union[str, Sequence[str], None] = 'a2f6c8d04e19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'response_etag',
+        sa.Column('url', sa.String(), nullable=False),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint('url'),
+        if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('response_etag', if_exists=True)
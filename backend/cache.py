@@ -0,0 +1,137 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend, Value
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import Request
+from starlette.responses import Response
+from db.connect import AsyncSessionLocal
+from models.tmdb import DataVersion
+
+CACHE_PREFIX = "tmdb"
+CACHE_EXPIRE = 3600
+
+# Responses kept by the in-memory backend (used when REDIS_URL is missing)
+CACHE_MAX_ENTRIES = 2000
+
+# Seconds a worker reuses the data version before reading the `data_version` row again
+DATA_VERSION_TTL = 1.0
+
+# Last data version read by this worker and when it was read (monotonic clock)
+data_version: int = 0
+data_version_checked_at: Optional[float] = None
+
+async def request_key_builder(
+        func: Callable[..., Any],
+        namespace: str = "",
+        *,
+        request: Optional[Request] = None,
+        response: Optional[Response] = None,
+        args: Tuple[Any, ...] = (),
+        kwargs: Optional[Dict[str, Any]] = None
+    ) -> str:
+    """
+    Builds the cache key of a request from the data version, the endpoint and its declared parameters.
+
+    Args:
+        func (Callable): Endpoint being cached
+        namespace (str): Cache prefix and namespace of the endpoint
+        request (Request): Incoming request (unused)
+        response (Response): Outgoing response (unused)
+        args (tuple): Positional arguments of the endpoint (unused)
+        kwargs (dict): Keyword arguments of the endpoint (path and query parameters, database session)
+
+    Returns:
+        str: Cache key in the form `<prefix>:<namespace>:<data version>:<hash>`
+
+    Notes:
+        - The per-request database session is left out of the key, otherwise no request
+          would ever hit the cache.
+        - Only the endpoint's declared parameters are hashed, so undeclared query
+          parameters (e.g. `?page=1&junk=1`) share the entry of the plain request.
+        - Keys change with `current_data_version`, so responses cached before an ingest are
+          never served after it; this holds across workers and for the shared Redis backend alike.
+          Redis expires stale keys after CACHE_EXPIRE, the in-memory backend evicts them
+          (see `BoundedInMemoryBackend`).
+    """
+    params = sorted((name, value) for name, value in (kwargs or {}).items() if not isinstance(value, AsyncSession))
+    digest = hashlib.md5(f"{func.__module__}.{func.__qualname__}:{params}".encode()).hexdigest()
+    return f"{namespace}:{await current_data_version()}:{digest}"
+
+async def current_data_version() -> int:
+    """
+    Returns the dataset version bumped by the ingestion scripts (see `utils.db_helpers.bump_data_version`).
+
+    Returns:
+        int: Version stored in the `data_version` row, 0 if nothing was ingested yet
+
+    Notes:
+        - Read from the database, so every worker agrees on it and it changes as soon as
+          an ingest commits, without restarting the API.
+        - Re-read at most every DATA_VERSION_TTL seconds per worker.
+    """
+    global data_version, data_version_checked_at
+    now = time.monotonic()
+    if data_version_checked_at is None or now - data_version_checked_at >= DATA_VERSION_TTL:
+        async with AsyncSessionLocal() as session:
+            data_version = await session.scalar(select(DataVersion.version).where(DataVersion.id == 1)) or 0
+        data_version_checked_at = now
+    return data_version
+
+def etag_for(version: int, path: str) -> str:
+    """
+    Builds the ETag of a static endpoint from the data version and its path.
+
+    Args:
+        version (int): Current data version, see `current_data_version`
+        path (str): Request path, which identifies the resource (e.g. `/movies/550/`)
+
+    Returns:
+        str: Quoted entity tag, e.g. `"3f2a9c0d1e4b5a67"`
+    """
+    digest = hashlib.blake2b(f"{version}:{path}".encode(), digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+class BoundedInMemoryBackend(InMemoryBackend):
+    """
+    In-process cache holding at most `max_entries` responses, evicting the least recently used.
+
+    Notes:
+        - fastapi-cache's InMemoryBackend only drops an expired entry when its key is read
+          again, and keys of an older data version are never read, so without a bound
+          the store grows with every ingest.
+    """
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES) -> None:
+        self._store: OrderedDict = OrderedDict()
+        self.max_entries = max_entries
+
+    def _get(self, key: str) -> Optional[Value]:
+        value = super()._get(key)
+        if value is not None:
+            self._store.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        async with self._lock:
+            self._store[key] = Value(value, self._now + (expire or 0))
+            self._store.move_to_end(key)
+            while len(self._store) > self.max_entries:
+                self._store.popitem(last=False)
+
+def init_cache() -> None:
+    """
+    Initializes the response cache with Redis, or an in-process cache if REDIS_URL is missing.
+    """
+    redis_url = os.getenv("REDIS_URL")
+    if redis_url:
+        backend = RedisBackend(aioredis.from_url(redis_url))
+    else:
+        print('REDIS_URL value missing in .env, using in-memory cache')
+        backend = BoundedInMemoryBackend()
+    FastAPICache.init(backend, prefix=CACHE_PREFIX, expire=CACHE_EXPIRE, key_builder=request_key_builder)
@@ -1,13 +1,20 @@
-import json
+from contextlib import asynccontextmanager
 from math import ceil
 import os
-from typing import Any, Dict, List, Optional
-from fastapi import Depends, FastAPI, HTTPException, Query
-from sqlalchemy import extract, func
-from sqlalchemy.orm import Session
-from backend.schema import CreditResponse, GenreResponse, MovieResponse, PaginatedMovieResponse, PaginatedPeopleResponse, PeopleResponse
-from db.connect import get_db
-from models.tmdb import Credit, Genre, Movie, MovieGenre, People
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from fastapi_cache.decorator import cache
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import Integer, Select, column, func, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import defer, raiseload
+from backend.cache import current_data_version, etag_for, init_cache
+from backend.schema import CreditResponse, GenreResponse, MovieCursor, MovieListItemResponse, MovieResponse, PaginatedMovieResponse, PaginatedPeopleResponse, PeopleListItemResponse, PeopleResponse
+from db.connect import FTS_TABLE, AsyncSessionLocal, async_engine, get_db, init_db, warm_pool
+from models.tmdb import Credit, Genre, Movie, MovieCreditsCache, MovieGenre, People
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 
@@ -20,7 +27,45 @@ if not FRONTEND_URL:
 else:
     allowed_origins = [FRONTEND_URL]
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Set RECSYS_SKIP_INIT when the schema is managed elsewhere (e.g. tests, alembic)
+    if not os.getenv("RECSYS_SKIP_INIT"):
+        init_db()
+    init_cache()
+    await warm_pool()
+    yield
+    await async_engine.dispose()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+# Endpoints whose response only changes when the dataset is reloaded
+STATIC_PATHS = re.compile(r'^/(genres/|movies/\d+/(credits/|genres/)?)$')
+
+@app.middleware("http")
+async def conditional_get(request: Request, call_next):
+    """
+    Answers repeat GETs of static endpoints with `304 Not Modified` when the client's ETag matches.
+
+    Notes:
+        - A matching `If-None-Match` is answered before routing, so it costs no
+          database query and no JSON encoding.
+        - The ETag only depends on the data version and the path, see `backend.cache.etag_for`,
+          so it changes as soon as an ingest commits.
+    """
+    if request.method != "GET" or not STATIC_PATHS.match(request.url.path):
+        return await call_next(request)
+
+    etag = etag_for(await current_data_version(), request.url.path)
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers["ETag"] = etag
+    return response
+
 # Enable CORS
 app.add_middleware(
     CORSMiddleware,
@@ -31,13 +76,184 @@ app.add_middleware(
 )
 
 PAGE_SIZE = 20
+PREFIX_SEARCH_LENGTH = 3
+
+async def paginate(db: AsyncSession, stmt: Select, page: int, total_count: Optional[int]=None) -> Tuple[int, List[Any]]:
+    """
+    Fetches one page of a statement together with the total row count.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session
+        stmt (Select): Filtered (and ordered) select of a single entity to paginate
+        page (int): Page number to fetch (starts from 1)
+        total_count (int): Already known total (e.g. from `table_total`), counted when None
+
+    Returns:
+        Tuple[int, List[Any]]: Total number of rows matching the query and the rows of the page
+
+    Notes:
+        - The total is a separate `COUNT(*)` rather than a `COUNT(*) OVER ()` column on the
+          page query: the window makes SQLite materialise every matching row before the
+          LIMIT, which is several times slower on large results.
+        - The page query is skipped when the page is past the last one.
+        - List endpoints defer `Movie.overview` / `People.biography`, which only the
+          detail endpoints return.
+    """
+    if total_count is None:
+        total_count = await db.scalar(select(func.count()).select_from(stmt.order_by(None).subquery()))
+    offset = (page-1)*PAGE_SIZE
+    if offset >= total_count:
+        return total_count, []
+    return total_count, (await db.scalars(stmt.limit(PAGE_SIZE).offset(offset))).all()
+
+# (data version, total) of the unfiltered count of each table, see `table_total`
+table_totals: Dict[Type[Any], Tuple[int, int]] = {}
+
+async def table_total(db: AsyncSession, model: Type[Any]) -> int:
+    """
+    Returns the number of rows of `model`, counted once per data version.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session
+        model (Base): Model to count (e.g. Movie, People)
+
+    Returns:
+        int: Number of rows in the table
+
+    Notes:
+        - Recounted only after an ingest bumps `backend.cache.current_data_version`, so the
+          unfiltered list endpoints do not scan the whole table on every request.
+    """
+    version = await current_data_version()
+    cached = table_totals.get(model)
+    if cached is None or cached[0] != version:
+        cached = (version, await db.scalar(select(func.count()).select_from(model)))
+        table_totals[model] = cached
+    return cached[1]
+
+async def all_movies_page(db: AsyncSession, page: int) -> Tuple[int, List[Movie]]:
+    """
+    Fetches one page of all movies, newest first, together with the number of movies.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session
+        page (int): Page number to fetch (starts from 1)
+
+    Returns:
+        Tuple[int, List[Movie]]: Total number of movies and the movies of the page
+
+    Notes:
+        - The total comes from `table_total` instead of a count on every request.
+    """
+    stmt = keyset(select(Movie).options(defer(Movie.overview)), None, None)
+    return await paginate(db, stmt, page, total_count=await table_total(db, Movie))
+
+def construct(model: Type[BaseModel], row: Any) -> BaseModel:
+    """
+    Builds a response model from an ORM row without running Pydantic validation.
+
+    Args:
+        model (Type[BaseModel]): Response model to build
+        row (Any): ORM instance exposing every field of `model` as an attribute
+
+    Returns:
+        BaseModel: Unvalidated instance of `model`
+
+    Notes:
+        - Rows come straight from our own database, so re-validating every field
+          on the way out of the list endpoints is wasted work.
+    """
+    return model.model_construct(**{field: getattr(row, field) for field in model.model_fields})
+
+def keyset(stmt: Select, after_release_date: Optional[str], after_id: Optional[int]) -> Select:
+    """
+    Orders a movie statement by `(release_date, id)` descending and seeks past the given cursor.
+
+    Args:
+        stmt (Select): Filtered select of Movie
+        after_release_date (str): Release date of the last movie of the previous page, None if it had none
+        after_id (int): ID of the last movie of the previous page, None for the first page
+
+    Returns:
+        Select: Ordered statement, starting right after the cursor when `after_id` is provided
+
+    Notes:
+        - Seeking with `(release_date, id) < (?, ?)` lets SQLite range-scan `ix_movie_release_id`
+          instead of reading and discarding `offset` rows, so deep pages cost the same as page 1.
+        - Undated movies sort after every dated one (NULLs are smallest in SQLite) but never
+          satisfy the row-value comparison; a dated cursor only seeks through dated movies
+          (`seek_page` appends the undated ones), an undated cursor seeks through the rest by ID.
+    """
+    stmt = stmt.order_by(Movie.release_date.desc(), Movie.id.desc())
+    if after_id is None:
+        return stmt
+    if after_release_date is None:
+        return stmt.where(Movie.release_date.is_(None), Movie.id < after_id)
+    return stmt.where(tuple_(Movie.release_date, Movie.id) < tuple_(after_release_date, after_id))
+
+def fts_title_match(query: str) -> Optional[str]:
+    """
+    Builds an FTS5 MATCH expression that prefix-matches every word of `query` in the title.
+
+    Args:
+        query (str): Free-text title search entered by the user
+
+    Returns:
+        Optional[str]: MATCH expression (e.g. `title : ("star"* AND "wars"*)`), or None if
+        the query has no searchable words
+    """
+    words = re.findall(r'\w+', query)
+    if not words:
+        return None
+    terms = " AND ".join(f'"{word}"*' for word in words)
+    return f'title : ({terms})'
+
+def prefix_upper_bound(prefix: str) -> str:
+    """
+    Returns the smallest string sorting after every string that starts with `prefix` (e.g. `ab` -> `ac`).
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+async def seek_page(db: AsyncSession, stmt: Select, after_release_date: Optional[str], after_id: int) -> Tuple[List[Movie], bool]:
+    """
+    Fetches the page of a movie statement starting right after the cursor, in `keyset` order.
+
+    Args:
+        db (AsyncSession): SQLAlchemy async database session
+        stmt (Select): Filtered select of Movie
+        after_release_date (str): Release date of the cursor, None if the cursor movie is undated
+        after_id (int): Movie ID of the cursor
+
+    Returns:
+        Tuple[List[Movie], bool]: Movies of the page and whether more movies follow it
+
+    Notes:
+        - Reads PAGE_SIZE + 1 rows and no count, so a cursor page costs the same at any
+          depth; the extra row only tells whether a next page exists.
+        - Once the dated movies run out, the page is topped up with the undated ones, which
+          come last; both lookups are range scans on `ix_movie_release_id`.
+    """
+    rows = list((await db.scalars(keyset(stmt, after_release_date, after_id).limit(PAGE_SIZE + 1))).all())
+    if after_release_date is not None and len(rows) <= PAGE_SIZE:
+        undated = keyset(stmt.where(Movie.release_date.is_(None)), None, None)
+        rows.extend((await db.scalars(undated.limit(PAGE_SIZE + 1 - len(rows)))).all())
+    return rows[:PAGE_SIZE], len(rows) > PAGE_SIZE
+
+def next_cursor(results: List[Movie], has_more: bool) -> Optional[MovieCursor]:
+    """
+    Builds the cursor for the page following `results`, or None if this is the last page.
+    """
+    if not has_more or not results:
+        return None
+    last = results[-1]
+    return MovieCursor(release_date=last.release_date, id=last.id)
 
 @app.get('/')
-def home():
+async def home():
     return {"message": "welcome, to tmdb"}
 
 @app.get('/health')
-def health_check() -> Dict[str, str]:
+async def health_check() -> Dict[str, str]:
     return {"message": "ok"}
 
 # Movie endpoints
@@ -48,48 +264,61 @@ def health_check() -> Dict[str, str]:
 # GET /movies/{movie_id}/genres/
 # GET /movies/{movie_id}/recommendations
 
-@app.get('/movies/', response_model=PaginatedMovieResponse)
-def get_all_movies(
+@app.get('/movies/', response_model=None, responses={200: {"model": PaginatedMovieResponse}})
+@cache(namespace="movies")
+async def get_all_movies(
     page: int=Query(1, ge=1, description="Page Number Starts from 1"),
-    db: Session=Depends(get_db)):
+    after_release_date: Optional[str]=Query(None, description="Cursor: release date of the last movie seen, omitted if it is null"),
+    after_id: Optional[int]=Query(None, description="Cursor: ID of the last movie seen"),
+    db: AsyncSession=Depends(get_db)):
     """
     Fetches all movies in paginated format (20 movies per page).
 
     Args:
-        page (int): Page number to fetch (starts from 1).
-        db (Session): SQLAlchemy database session.
+        page (int): Page number to fetch (starts from 1), ignored when a cursor (`after_id`) is provided.
+        after_release_date (str): Release date from `next_cursor` of the previous page, omitted if it is null.
+        after_id (int): Movie ID from `next_cursor` of the previous page.
+        db (AsyncSession): SQLAlchemy async database session.
 
     Returns:
-        PaginatedMovieResponse: A paginated list of Movies
+        PaginatedMovieResponse: A paginated list of Movies, with `next_cursor` set if more pages exist
 
     Raises:
         HTTPException: If no movies exist in the database. 
-    """
-    query = db.query(Movie)    
-    total_count = query.count()
 
-    if total_count == 0:
+    Notes:
+        - With a cursor, `total_count` is null: cursor pages are not counted, see `seek_page`.
+    """
+    use_cursor = after_id is not None
+    if use_cursor:
+        total_count = None
+        results, has_more = await seek_page(db, select(Movie).options(defer(Movie.overview)), after_release_date, after_id)
+    else:
+        total_count, results = await all_movies_page(db, page)
+        has_more = page*PAGE_SIZE < total_count
+
+    if total_count == 0 and not use_cursor:
         raise HTTPException(404, "No movies found in the database", headers={"X-Error": "ResourceMissing"})
 
-    offset = (page-1)*PAGE_SIZE
-    results = query.limit(PAGE_SIZE).offset(offset).all()
-
-    return PaginatedMovieResponse(
+    return ORJSONResponse(PaginatedMovieResponse.model_construct(
         total_count=total_count,
         page=page,
         page_size=PAGE_SIZE,
-        results=results
-    )
+        results=[construct(MovieListItemResponse, movie) for movie in results],
+        next_cursor=next_cursor(results, has_more)
+    ).model_dump())
     
-@app.get('/movies/search/', response_model=PaginatedMovieResponse)
-def search(
+@app.get('/movies/search/', response_model=None, responses={200: {"model": PaginatedMovieResponse}})
+async def search(
         query: Optional[str]=Query(None, description="Search by Title..."),
         genre: Optional[str]=Query(None, description="Search by Genre..."),
         year: Optional[int]=Query(None, description="Search by Release Year..."),
         status: Optional[str]=Query(None, description="Search by Status..."),
         language: Optional[str]=Query(None, description="Search by Language..."),
         page: int=Query(1, ge=1, description="Page Number, starts from 1"),
-        db: Session=Depends(get_db)):
+        after_release_date: Optional[str]=Query(None, description="Cursor: release date of the last movie seen, omitted if it is null"),
+        after_id: Optional[int]=Query(None, description="Cursor: ID of the last movie seen"),
+        db: AsyncSession=Depends(get_db)):
     """
     Fetches the movies using various filters (20 movies per page)
 
@@ -99,62 +328,93 @@ def search(
         year (str): Search movies by year of release
         status (str): Search movies by the status of movie (e.g Released, In Production, etc.)
         language (str): Search movies by language (e.g en, de, etc.)
-        page (int): Page number to fetch (Number starts from 1)
-        db (Session): SQLAlchemy database session
+        page (int): Page number to fetch (Number starts from 1), ignored when a cursor (`after_id`) is provided
+        after_release_date (str): Release date from `next_cursor` of the previous page, omitted if it is null
+        after_id (int): Movie ID from `next_cursor` of the previous page
+        db (AsyncSession): SQLAlchemy async database session
 
     Returns:
-        PaginatedMovieResponse: A paginated list of movies
+        PaginatedMovieResponse: A paginated list of movies, with `next_cursor` set if more pages exist
 
     Raises:
         HTTPException: If no movies exist in database with applied filters
         HTTPException: If page number exceeds maximum limit
+
+    Notes:
+        - With a cursor, `total_count` is null: cursor pages are not counted, see `seek_page`.
+        - Queries shorter than `PREFIX_SEARCH_LENGTH` are type-ahead input and match
+          titles starting with them, as a range scan on `ix_movie_lower_title`
+          (SQLite's LIKE cannot use an expression index).
+        - Longer queries are looked up in the `movie_fts` FTS5 index on SQLite and match
+          titles containing words starting with each of the query words.
+        - Without any filter this is the list of all movies, served by `all_movies_page`.
     """
-    q = db.query(Movie)
+    use_cursor = after_id is not None
+    query = query.strip() if query else query
+    filtered = any((query, genre, year, status, language))
+
+    q = select(Movie).options(defer(Movie.overview))
     if query:
-        query = query.strip()
-        q = q.filter(Movie.title.ilike(f'%{query}%'))
+        match = fts_title_match(query) if db.bind.dialect.name == "sqlite" else None
+        if len(query) < PREFIX_SEARCH_LENGTH:
+            prefix = query.lower()
+            title = func.lower(Movie.title)
+            q = q.where(title >= prefix, title < prefix_upper_bound(prefix))
+        elif match:
+            fts_ids = text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match")\
+                        .bindparams(match=match)\
+                        .columns(column('rowid', Integer))
+            q = q.where(Movie.id.in_(fts_ids))
+        else:
+            q = q.where(Movie.title.ilike(f'%{query}%'))
 
     if genre:
-        q = q.join(Movie.movie_genres).join(MovieGenre.genre).filter(Genre.name == genre)
+        genre = genre.strip()
+        q = q.join(Movie.movie_genres).join(MovieGenre.genre).where(func.lower(Genre.name) == genre.lower())
 
     if year:
-        q = q.filter(Movie.release_date != None)
-        q = q.filter(extract('year', Movie.release_date) == year)
+        q = q.where(Movie.release_year == year)
 
     if status:
         status = status.strip()
-        q = q.filter(func.lower(Movie.status) == status.lower())
+        q = q.where(func.lower(Movie.status) == status.lower())
 
     if language:
-        q = q.filter(func.lower(Movie.language) == language.lower())
-
-    total_count = q.count()
-    if total_count == 0:
-        raise HTTPException(404, "Resource Not Found with applied filters", headers={"X-Error": "ResourceMissing"})
-
-    total_pages = ceil(total_count/PAGE_SIZE)
-    if page > total_pages:
-        raise HTTPException(404, f"Page out of Range, Page should be lesser than {total_pages}")
-    
-    q = q.order_by(Movie.release_date.desc(), Movie.title.asc())
-    offset = (page-1)*PAGE_SIZE
-    results = q.limit(PAGE_SIZE).offset(offset).all()
-    
-    return PaginatedMovieResponse(
+        q = q.where(func.lower(Movie.language) == language.lower())
+
+    if use_cursor:
+        total_count = None
+        results, has_more = await seek_page(db, q, after_release_date, after_id)
+    else:
+        if filtered:
+            total_count, results = await paginate(db, keyset(q, None, None), page)
+        else:
+            total_count, results = await all_movies_page(db, page)
+        has_more = page*PAGE_SIZE < total_count
+        if total_count == 0:
+            raise HTTPException(404, "Resource Not Found with applied filters", headers={"X-Error": "ResourceMissing"})
+
+        total_pages = ceil(total_count/PAGE_SIZE)
+        if page > total_pages:
+            raise HTTPException(404, f"Page out of Range, Page should be lesser than {total_pages}")
+
+    return ORJSONResponse(PaginatedMovieResponse.model_construct(
         total_count=total_count,
         page=page,
         page_size=PAGE_SIZE,
-        results=results
-    )
+        results=[construct(MovieListItemResponse, movie) for movie in results],
+        next_cursor=next_cursor(results, has_more)
+    ).model_dump())
 
 @app.get('/movies/{movie_id}/', response_model=MovieResponse)
-def get_movie(movie_id: int, db: Session=Depends(get_db)):
+@cache(namespace="movies")
+async def get_movie(movie_id: int, db: AsyncSession=Depends(get_db)):
     """
     Fetch movie details by movie ID.
 
     Args:
         movie_id (int): Unique ID of the movie to retrieve
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
 
     Returns:
         MovieResponse: Serialized movie data
@@ -162,44 +422,84 @@ def get_movie(movie_id: int, db: Session=Depends(get_db)):
     Raises:
         HTTPException: If no movie is found with the provided ID     
     """
-    movie: Movie|None = db.query(Movie).filter(Movie.id == movie_id).one_or_none()
+    movie: Movie|None = await db.scalar(select(Movie).where(Movie.id == movie_id))
     if not movie:
         raise HTTPException(
                         404, 
                         f"Movie with ID: {movie_id} not found", 
                         headers={"X-Error": "ResourceMissing"}
                     )
-    return movie
+    return MovieResponse.model_validate(movie)
 
 @app.get('/movies/{movie_id}/credits/', response_model=List[CreditResponse])
-def get_movie_credits(movie_id: int, db: Session=Depends(get_db)):
+async def get_movie_credits(movie_id: int, db: AsyncSession=Depends(get_db)):
     """
     Fetch credits of movie by Movie ID
 
     Args:
         movie_id (int): Unique ID of the movie
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
 
     Returns:
         List[CreditResponse]: A list of credit entries for the movie
 
     Raises:
         HTTPException: If no movie is found with provided ID
+
+    Notes:
+        - Served from the precomputed `movie_credits_cache` payload when present, which
+          is a single primary key lookup returned as-is without Pydantic serialization.
+        - Otherwise the movie is checked first, then its credits are streamed to the
+          client as they are read, see `stream_credits`.
     """
-    movie: Movie|None = db.query(Movie).filter(Movie.id == movie_id).one_or_none()
-    if not movie:
+    payload: str|None = await db.scalar(select(MovieCreditsCache.payload).where(MovieCreditsCache.movie_id == movie_id))
+    if payload:
+        return Response(content=payload, media_type="application/json")
+
+    movie_exists = await db.scalar(select(Movie.id).where(Movie.id == movie_id))
+    if not movie_exists:
         raise HTTPException(404, f"Movie with ID: {movie_id} not found", headers={"X-Error": "ResourceMissing"})
-    credits = movie.credits
-    return credits
+    return StreamingResponse(stream_credits(movie_id), media_type="application/json")
 
-@app.get('/movies/{movie_id}/genres/')
-def get_movie_genres(movie_id: int, db: Session=Depends(get_db)):
+async def stream_credits(movie_id: int) -> AsyncIterator[bytes]:
+    """
+    Encodes the credits of a movie as a JSON array, one credit at a time.
+
+    Args:
+        movie_id (int): Unique ID of the movie
+
+    Yields:
+        bytes: Chunks of the JSON array
+
+    Notes:
+        - Rows are fetched from SQLite 100 at a time, so neither the rows nor the
+          encoded body are ever held in memory as a whole.
+        - Opens its own session, since the request session is closed before the
+          response body is sent.
+        - `name` and `gender` are stored on the credit row at ingest, so no `People`
+          rows are needed; `raiseload` turns any accidental lazy load into an error.
+    """
+    stmt = select(Credit).options(raiseload('*'))\
+            .where(Credit.movie_id == movie_id)\
+            .execution_options(yield_per=100)
+    async with AsyncSessionLocal() as db:
+        credits = await db.stream_scalars(stmt)
+        yield b'['
+        separator = b''
+        async for credit in credits:
+            yield separator + orjson.dumps(CreditResponse.model_validate(credit).model_dump())
+            separator = b','
+        yield b']'
+
+@app.get('/movies/{movie_id}/genres/', response_model=List[GenreResponse])
+@cache(namespace="movies")
+async def get_movie_genres(movie_id: int, db: AsyncSession=Depends(get_db)):
     """
     Fetches the genres of the given movie by its ID
 
     Args:
         movie_id (int): Unique ID of the movie
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
 
     Returns:
         List[GenreResponse]: A list of all the genres for the movie
@@ -207,13 +507,13 @@ def get_movie_genres(movie_id: int, db: Session=Depends(get_db)):
     Raises:
         HTTPException: If no genres do not exist for the given movie
     """
-    genres: List[Genre]|None = db.query(Genre).join(MovieGenre).filter(MovieGenre.movie_id == movie_id).all()
+    genres: List[Genre] = (await db.scalars(select(Genre).join(MovieGenre).where(MovieGenre.movie_id == movie_id))).all()
     if not genres:
         raise HTTPException(404, f"Movie with ID: {movie_id} not found", headers={'X-Error': "ResourceMissing"})
-    return genres
+    return [GenreResponse.model_validate(genre) for genre in genres]
 
 @app.get('/movies/{movie_id}/recommendations/')
-def get_recommendation(movie_id: int, db: Session=Depends(get_db)):
+async def get_recommendation(movie_id: int, db: AsyncSession=Depends(get_db)):
     pass
 
 # People Endpoints
@@ -221,14 +521,14 @@ def get_recommendation(movie_id: int, db: Session=Depends(get_db)):
 # GET /people/{person_id}
 # GET /people/{person_id}/movies
 
-@app.get('/people/', response_model=PaginatedPeopleResponse)
-def get_people(page: int=Query(1, ge=1, description='Page Number Starts from 1'), db: Session=Depends(get_db)):
+@app.get('/people/', response_model=None, responses={200: {"model": PaginatedPeopleResponse}})
+async def get_people(page: int=Query(1, ge=1, description='Page Number Starts from 1'), db: AsyncSession=Depends(get_db)):
     """
     Fetches the details of all people in database (20 people per page)
 
     Args:
         page (int): Page number to fetch (Starts from 1)
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
 
     Returns:
         PaginatedPeopleResponse: Paginated list of People
@@ -237,8 +537,8 @@ def get_people(page: int=Query(1, ge=1, description='Page Number Starts from 1')
         HTTPException: If no people exist in the database
         HTTPException: If page number exceeds the maximum pages limit
     """
-    people: People|None = db.query(People)
-    total_count = people.count()
+    people = select(People).options(defer(People.biography))
+    total_count, results = await paginate(db, people, page, total_count=await table_total(db, People))
     if total_count == 0:
         raise HTTPException(404, "No People found in the database", headers={"X-Error": "ResourceMissing"})
     
@@ -249,31 +549,22 @@ def get_people(page: int=Query(1, ge=1, description='Page Number Starts from 1')
                 f"Page number out of range, Maximum allowed pages is {total_pages}",
                 headers={"X-Error": "ResourceMissing"}
             )
-    offset = (page-1)*PAGE_SIZE
-    results = people.limit(PAGE_SIZE).offset(offset).all()
 
-    for person in results:
-        if isinstance(person.alias, str):
-            try:
-                person.alias = json.loads(person.alias)
-            except Exception:
-                person.alias = []
-
-    return PaginatedPeopleResponse(
+    return ORJSONResponse(PaginatedPeopleResponse.model_construct(
         total_count=total_count,
         page=page,
         page_size=PAGE_SIZE,
-        results=results
-    )
+        results=[construct(PeopleListItemResponse, person) for person in results]
+    ).model_dump())
 
 @app.get('/people/{person_id}/', response_model=PeopleResponse)
-def get_person(person_id: int, db: Session=Depends(get_db)):
+async def get_person(person_id: int, db: AsyncSession=Depends(get_db)):
     """
     Fetch details of a person by their ID
 
     Args:
         person_id (int): Unique ID of the People to retreive
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
 
     Returns:
         PeopleResponse: Serialized data of people with given ID
@@ -281,23 +572,17 @@ def get_person(person_id: int, db: Session=Depends(get_db)):
     Raises:
         HTTPException: If person with people ID is not found
     """
-    person: People|None = db.query(People).filter(People.id == person_id).one_or_none()
+    person: People|None = await db.scalar(select(People).where(People.id == person_id))
     if not person:
         raise HTTPException(404, f"Person with ID: {person_id} not found", headers={"X-Error": "ResourceMissing"})
 
-    if isinstance(person.alias, str):
-        try:
-            person.alias = json.loads(person.alias)
-        except Exception:
-            person.alias = []
-
     return person
 
-@app.get('/people/{person_id}/movies/', response_model=PaginatedMovieResponse)
-def get_movies_for_person(
+@app.get('/people/{person_id}/movies/', response_model=None, responses={200: {"model": PaginatedMovieResponse}})
+async def get_movies_for_person(
                         person_id: int, 
                         page: int=Query(1, ge=1, description='Page Number Starts from 1'),
-                        db: Session=Depends(get_db)
+                        db: AsyncSession=Depends(get_db)
                     ):
     """
     Fetches movies of the people by person ID (Max 20 movies per page)
@@ -305,7 +590,7 @@ def get_movies_for_person(
     Args:
         person_id (int): Unique ID of the People
         page (int): Page Number to fetch (Page number starts from 1)
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
 
     Returns:
         PaginatedMovieResponse: Paginated list of movies
@@ -314,30 +599,30 @@ def get_movies_for_person(
         HTTPException: If no people exists with provided person ID
 
     """
-    movies = db.query(Movie).join(Credit).filter(Credit.person_id == person_id)
-    total_count = movies.count()
+    movies = select(Movie).options(defer(Movie.overview)).join(Credit).where(Credit.person_id == person_id)
+    total_count, results = await paginate(db, movies, page)
     if total_count == 0:
         raise HTTPException(404, f"Person with ID: {person_id} not found", headers={"X-Error": "ResourceMissing"})
-    offset = (page-1)*PAGE_SIZE
-    results = movies.limit(PAGE_SIZE).offset(offset).all()
-    return PaginatedMovieResponse(
+    return ORJSONResponse(PaginatedMovieResponse.model_construct(
         total_count=total_count,
         page=page,
         page_size=PAGE_SIZE,
-        results=results
-    )
+        results=[construct(MovieListItemResponse, movie) for movie in results],
+        next_cursor=None
+    ).model_dump())
 
 # Genre Endpoints
 # GET /genres/
 # GET /genres/{genre_name}/movies/
 
 @app.get('/genres/', response_model=List[GenreResponse])
-def get_all_genres(db:Session=Depends(get_db)):
+@cache(namespace="genres")
+async def get_all_genres(db: AsyncSession=Depends(get_db)):
     """
     Fetches all the genres in the database
 
     Args:
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
 
     Returns: 
         List[GenreResponse]: List of the genres in the database
@@ -345,16 +630,16 @@ def get_all_genres(db:Session=Depends(get_db)):
     Raises:
         HTTPException: If no genres exist in the database
     """
-    genres: List[Genre] = db.query(Genre).order_by(Genre.id).all()
+    genres: List[Genre] = (await db.scalars(select(Genre).order_by(Genre.id))).all()
     if not genres:
         raise HTTPException(404, "Genres Not Found", headers={"X-Error": "ResourceMissing"})
-    return genres
+    return [GenreResponse.model_validate(genre) for genre in genres]
 
-@app.get('/genres/{genre_name}/', response_model=PaginatedMovieResponse)
-def get_movies_by_genre_name(
+@app.get('/genres/{genre_name}/', response_model=None, responses={200: {"model": PaginatedMovieResponse}})
+async def get_movies_by_genre_name(
                 genre_name: str,
                 page: int=Query(1, ge=1, description='Page Number Starts from 1...'),
-                db: Session=Depends(get_db)
+                db: AsyncSession=Depends(get_db)
             ):
     """
     Fetches all the movies having provided genre name
@@ -362,25 +647,27 @@ def get_movies_by_genre_name(
     Args:
         genre_name (str): Genre name of the movies to retrieve
         page (int): Page number to fetch (Page number starts from 1)
-        db (Session): SQLAlchemy database session
+        db (AsyncSession): SQLAlchemy async database session
 
     Returns:
         PaginatedMovieResponse: Paginated list of movies of genre name provided
 
     Raises:
-        HTTPException: If no genre name is found in the database
+        HTTPException: If the genre does not exist or has no movies
         HTTPException: If page number exceeds the maximum range
-        HTTPException: If movies are not found with the given genre name
+
+    Notes:
+        - The genre is resolved inside the movie query (case-insensitive exact match on
+          `ix_genre_name_lower`), so no separate genre lookup is needed.
     """
-    genre = db.query(Genre).filter(Genre.name.ilike(f'%{genre_name}%')).one_or_none()
-    if not genre:
-        raise HTTPException(404, f"Genre `{genre_name}` is not found", headers={"X-Error": "ResourceMissing"})
-    
-    movies = db.query(Movie)\
+    movies = select(Movie)\
+            .options(defer(Movie.overview))\
             .join(MovieGenre, Movie.id == MovieGenre.movie_id)\
-            .filter(MovieGenre.genre_id == genre.id)
+            .join(Genre, Genre.id == MovieGenre.genre_id)\
+            .where(func.lower(Genre.name) == genre_name.lower())\
+            .order_by(Movie.release_date.desc(), Movie.title.asc())
     
-    total_count = movies.count()
+    total_count, results = await paginate(db, movies, page)
     if total_count == 0:
         raise HTTPException(404, f"No movies found with genre `{genre_name}`", headers={"X-Error": "ResourceMissing"})
 
@@ -391,14 +678,11 @@ def get_movies_by_genre_name(
                 f"Page number out of range, Maximum allowed pages is {total_pages}",
                 headers={"X-Error": "ResourceMissing"}
             )
-    
-    offset = (page-1)*PAGE_SIZE
-    movies = movies.order_by(Movie.release_date.desc(), Movie.title.asc())
-    results = movies.limit(PAGE_SIZE).offset(offset).all()
-    
-    return PaginatedMovieResponse(
+
+    return ORJSONResponse(PaginatedMovieResponse.model_construct(
         total_count=total_count,
         page=page,
         page_size=PAGE_SIZE,
-        results=results
-    )
\ No newline at end of file
+        results=[construct(MovieListItemResponse, movie) for movie in results],
+        next_cursor=None
+    ).model_dump())
\ No newline at end of file
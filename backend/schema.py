@@ -5,6 +5,10 @@ class GenreResponse(BaseModel):
     id: int
     name: str
 
+    model_config = {
+        "from_attributes": True
+    }
+
 class MovieResponse(BaseModel):
     id: int
     is_adult: bool
@@ -22,6 +26,22 @@ class MovieResponse(BaseModel):
         "from_attributes": True
     }
 
+class MovieListItemResponse(BaseModel):
+    id: int
+    is_adult: bool
+    language: str
+    original_title: str
+    poster_path: Optional[str]
+    release_date: str
+    runtime: int
+    title: str
+    status: str
+    vote_average: float
+
+    model_config = {
+        "from_attributes": True
+    }
+
 class CreditResponse(BaseModel):
     id: str
     movie_id: int
@@ -48,14 +68,33 @@ class PeopleResponse(BaseModel):
         "from_attributes": True
     }
 
+class MovieCursor(BaseModel):
+    # None once the cursor reaches the undated movies, which are listed last
+    release_date: Optional[str]
+    id: int
+
+class PeopleListItemResponse(BaseModel):
+    id: int
+    is_adult: bool
+    alias: Optional[List[str]]
+    gender: str
+    name: str
+    place_of_birth: Optional[str]
+    profile_path: Optional[str]
+
+    model_config = {
+        "from_attributes": True
+    }
+
 class PaginatedMovieResponse(BaseModel):
-    total_count: int
+    total_count: Optional[int]  # None for cursor (keyset) pages, which are not counted
     page: int
     page_size: int
-    results: List[MovieResponse]
+    results: List[MovieListItemResponse]
+    next_cursor: Optional[MovieCursor] = None
 
 class PaginatedPeopleResponse(BaseModel):
     total_count: int
     page: int
     page_size: int
-    results: List[PeopleResponse]
\ No newline at end of file
+    results: List[PeopleListItemResponse]
\ No newline at end of file
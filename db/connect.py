@@ -1,11 +1,21 @@
 import os
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from sqlalchemy import create_engine, event, text
 from dotenv import load_dotenv
 
-load_dotenv()
+if not os.getenv('DB_PATH'):
+    load_dotenv()
 db_path = os.getenv('DB_PATH')
 DATABASE_URL = f"sqlite:///{os.path.abspath(db_path)}"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{os.path.abspath(db_path)}"
+
+# Pool size of the sync engine used by the ingestion scripts
+POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))
+
+# Sync engine used by the ingestion scripts and schema setup
 
 engine = create_engine(
     DATABASE_URL,
@@ -13,22 +23,138 @@ engine = create_engine(
         "check_same_thread": False,
         "timeout": 30               
     },
-    pool_size=5,
+    pool_size=POOL_SIZE,
     max_overflow=10,                
     pool_timeout=30,                 
+    pool_pre_ping=True,
+    pool_recycle=3600,
+    query_cache_size=1200,      # room for every insert/select of the scripts to stay compiled
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
     echo=False                   
 )
+
+# Async engine used by the FastAPI service. The API only reads, so every session of a
+# worker shares one connection (safe with WAL, where the ingestion writer never blocks it)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={
+        "check_same_thread": False,
+        "timeout": 30
+    },
+    # No pre-ping/recycle: the single shared connection would be closed under in-flight sessions
+    poolclass=StaticPool,
+    json_serializer=lambda obj: orjson.dumps(obj).decode(),
+    json_deserializer=orjson.loads,
+    echo=False
+)
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",      # readers no longer block the writer (and vice versa)
+    "synchronous": "NORMAL",    # fsync on checkpoint instead of every commit, safe with WAL
+    "busy_timeout": 30000,      # wait up to 30s for a lock inside SQLite instead of failing
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,     # 256 MB
+    "cache_size": -65536,       # 64 MB (negative values are KiB)
+}
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    Applies SQLITE_PRAGMAS to every new DBAPI connection of both engines.
+
+    Notes:
+        - `foreign_keys` is left off: credits are ingested before the people they
+          reference, so enforcing it would reject the credits pipeline step.
+    """
+    cursor = dbapi_connection.cursor()
+    for pragma, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {pragma}={value}")
+    cursor.close()
+
 SessionLocal = sessionmaker(bind=engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
+FTS_TABLE = "movie_fts"
+
+# FTS5 index over `movie(title, overview)` and the triggers keeping it in sync, shared by
+# `init_fts` and the alembic migration that adds it
+FTS_DDL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+    USING fts5(title, overview, content='movie', content_rowid='id')
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON movie BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, overview) VALUES (new.id, new.title, new.overview);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON movie BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, overview) VALUES ('delete', old.id, old.title, old.overview);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE ON movie BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, overview) VALUES ('delete', old.id, old.title, old.overview);
+        INSERT INTO {FTS_TABLE}(rowid, title, overview) VALUES (new.id, new.title, new.overview);
+    END
+    """,
+)
+FTS_REBUILD = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+def init_fts():
+    """
+    Creates the FTS5 index over `movie(title, overview)` and the triggers keeping it in sync.
+
+    Notes:
+        - Only runs on SQLite, other databases keep using the ILIKE title search.
+        - The index is an external-content table, so it stores tokens only and reads
+          the text back from `movie`.
+        - Rebuilt from the existing rows the first time it is created.
+        - Skipped until the `movie` table exists, since the triggers are defined on it.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as conn:
+        tables = {
+            name for (name,) in conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type='table' AND name IN ('movie', :name)"),
+                {"name": FTS_TABLE}
+            )
+        }
+        if "movie" not in tables:
+            return
+        exists = FTS_TABLE in tables
+        for statement in FTS_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(FTS_REBUILD))
+
 def init_db():
+    """
+    Creates the missing tables and the FTS index.
+
+    Notes:
+        - Not run on import: models must be registered on `Base` first, and every
+          importer (workers, scripts) would otherwise repeat the schema checks.
+    """
     Base.metadata.create_all(bind=engine)
+    init_fts()
+
+async def warm_pool():
+    """
+    Opens the shared connection of the async engine at startup.
 
-init_db()
+    Notes:
+        - The connection is created (and pragmas applied) before the first request
+          instead of inside it.
+    """
+    async with async_engine.connect():
+        pass
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
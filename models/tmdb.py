@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Float, Integer, String, Text, ForeignKey
+from sqlalchemy import JSON, Boolean, Column, Float, Index, Integer, String, Text, ForeignKey, func
 from sqlalchemy.orm import relationship
 from db.connect import Base
 
@@ -12,6 +12,9 @@ class Genre(Base):
     name = Column(String)
     movie_genres = relationship("MovieGenre", back_populates="genre", cascade="all, delete-orphan")
 
+# Expression indexes backing the case-insensitive `lower(col) = lower(value)` filters
+Index('ix_genre_name_lower', func.lower(Genre.name))
+
 class Movie(Base):
     __tablename__ = "movie"
     id = Column(Integer ,primary_key=True)
@@ -21,6 +24,7 @@ class Movie(Base):
     overview = Column(Text)
     poster_path = Column(String)
     release_date = Column(String)
+    release_year = Column(Integer, index=True)
     runtime = Column(Integer)
     title = Column(String)
     status = Column(String)
@@ -29,6 +33,16 @@ class Movie(Base):
     credits = relationship("Credit", back_populates="movie", cascade="all, delete-orphan")
     movie_genres = relationship("MovieGenre", back_populates="movie", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Serves keyset pagination on (release_date, id); scanned backwards for DESC order
+        Index('ix_movie_release_id', 'release_date', 'id'),
+    )
+
+Index('ix_movie_status_lower', func.lower(Movie.status))
+# Range-scanned by short (type-ahead) title searches, see `backend.main.search`
+Index('ix_movie_lower_title', func.lower(Movie.title))
+Index('ix_movie_language_lower', func.lower(Movie.language))
+
 class MovieGenre(Base):
     __tablename__ = "movie_genre"
     genre_id = Column(Integer, ForeignKey('genre.id'), primary_key=True)
@@ -37,6 +51,11 @@ class MovieGenre(Base):
     genre = relationship("Genre", back_populates="movie_genres")
     movie = relationship("Movie", back_populates="movie_genres")
 
+    __table_args__ = (
+        # The (genre_id, movie_id) primary key covers genre lookups; this covers the movie side
+        Index('ix_moviegenre_movie_id', 'movie_id'),
+    )
+
 class Credit(Base):
     __tablename__ = "credit"
     id = Column(String, primary_key=True)
@@ -49,11 +68,17 @@ class Credit(Base):
     movie = relationship("Movie", back_populates="credits")
     person = relationship("People", back_populates="credits")
 
+    __table_args__ = (
+        Index('ix_credit_movie_id', 'movie_id'),
+        # Leading person_id also serves plain person lookups; movie_id makes the people -> movies join index-only
+        Index('ix_credit_person_movie', 'person_id', 'movie_id'),
+    )
+
 class People(Base):
     __tablename__ = "people"
     id = Column(Integer, primary_key=True)
     is_adult = Column(Boolean)
-    alias = Column(Text)
+    alias = Column(JSON)
     biography = Column(Text)
     birthday = Column(String)
     gender = Column(String)
@@ -62,3 +87,20 @@ class People(Base):
     profile_path = Column(String)
 
     credits = relationship("Credit", back_populates="person", cascade="all, delete-orphan")
+
+class MovieCreditsCache(Base):
+    __tablename__ = "movie_credits_cache"
+    movie_id = Column(Integer, primary_key=True)
+    payload = Column(Text)
+
+class ResponseETag(Base):
+    # ETag of the last TMDB response per URL, sent back as If-None-Match on re-runs
+    __tablename__ = "response_etag"
+    url = Column(String, primary_key=True)
+    etag = Column(String)
+
+class DataVersion(Base):
+    # Single row (id=1) bumped by every ingest commit, the API derives its ETags and cached totals from it
+    __tablename__ = "data_version"
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
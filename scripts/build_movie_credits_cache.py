@@ -0,0 +1,22 @@
+from db.connect import SessionLocal
+from utils.db_helpers import rebuild_movie_credits_cache
+
+def main() -> None:
+    """
+    Rebuilds the precomputed credits payloads served by `/movies/{movie_id}/credits/`.
+
+    Notes:
+        - `fetch_movie_credits.py` already rebuilds the cache after an ingest, run this
+          after editing credits by other means.
+    """
+    db_session = SessionLocal()
+    try:
+        cached = rebuild_movie_credits_cache(db_session)
+        print(f'Cached credits for {cached} movies')
+    except Exception as e:
+        print(f'[Exception] - {e}')
+    finally:
+        db_session.close()
+
+if __name__ == "__main__":
+    main()
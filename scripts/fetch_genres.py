@@ -5,6 +5,7 @@ from dotenv import load_dotenv
 import requests
 from db.connect import SessionLocal
 from models.tmdb import Genre
+from utils.db_helpers import save_batch
 
 session = SessionLocal()
 
@@ -63,7 +64,7 @@ def main():
         2. Saves new genres to the database.
 
     Notes:
-        - Skips existing genre to avoid duplication.
+        - Existing genres are skipped by the database (ON CONFLICT DO NOTHING).
         - Uses bulk insertion for efficiency.
     """
     try:
@@ -72,15 +73,11 @@ def main():
              "https://api.themoviedb.org/3/genre/tv/list"
         ]
         
-        existing_genre_ids = {genre.id for genre in session.query(Genre).all()}
-        genres_result = fetch_genres(endpoints=endpoints)
-        new_genres_list = []
-        for _genre in genres_result:
-            new_genres_list = [Genre(id=genre['id'], name=genre['name']) for genre in genres_result if genre['id'] not in existing_genre_ids]
-        if new_genres_list:
-                session.bulk_save_objects(new_genres_list)
-                session.commit()
-                print(f"Inserted {len(new_genres_list)} new genres.")
+        genres_result = fetch_genres(endpoints=endpoints) or []
+        genres_list = [{'id': genre['id'], 'name': genre['name']} for genre in genres_result]
+        inserted = save_batch(records=genres_list, session=session, model=Genre)
+        if inserted:
+                print(f"Inserted {inserted} new genres.")
         else:
                 print('No new Genres to insert in DB.')
     except Exception as e:
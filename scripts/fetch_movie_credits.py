@@ -1,29 +1,20 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 import os
-import time
 import traceback
-from typing import List
+from typing import Any, Dict, List
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import httpx
+import orjson
+from sqlalchemy import select
 from tqdm import tqdm
 
 from dotenv import load_dotenv
 from models.tmdb import Credit, MovieID
 from db.connect import SessionLocal
-from utils.db_helpers import save_batch
+from utils.db_helpers import BatchWriter, rebuild_movie_credits_cache
+from utils.http import as_completed_window, make_tmdb_client, retry_after, tmdb_limiter
 
 db_session = SessionLocal()
-https_session = requests.Session()
-retries = Retry(
-    total=5,
-    backoff_factor=1,
-    status_forcelist=[429, 502, 503, 504],
-    allowed_methods=["HEAD", "GET", "OPTIONS"]
-)
-adapter = HTTPAdapter(max_retries=retries)
-https_session.mount('https://', adapter=adapter)
 
 load_dotenv()
 bearer_token = os.getenv('BEARER_TOKEN')
@@ -32,21 +23,20 @@ if not bearer_token:
 
 endpoint = "https://api.themoviedb.org/3/movie/{}/credits"
 
-header = {
-    'accept': 'application/json',
-    'Authorization': f'Bearer {bearer_token}',
-    "User-Agent": "tmdb-fetcher/1.0"
-}
+MAX_CONCURRENCY = 100
+client = make_tmdb_client(bearer_token, MAX_CONCURRENCY)
+limiter = tmdb_limiter()
 
-def fetch_movie_credit(movie_id: int) -> List[Credit]:
+async def fetch_movie_credit(movie_id: int, semaphore: asyncio.Semaphore) -> List[Dict[str, Any]]:
     """
     Fetches the details of the Cast information of the Movie using its TMDB Movie ID.
     
     Args:
         movie_id (int): Unique ID of the movie to retrieve.
+        semaphore (asyncio.Semaphore): Caps the number of requests in flight.
 
     Returns:
-        List[Credit]: List of credit objects, each represented with the following fields:
+        List[Dict[str, Any]]: List of credit rows, each represented with the following fields:
             - id (int): Credit ID
             - gender (int): Gender of the cast member.
             - name (str): Name of the cast member.
@@ -54,20 +44,24 @@ def fetch_movie_credit(movie_id: int) -> List[Credit]:
             - movie_id (int): Associated Movie ID.
 
     Raises:
-        requests.exceptions.SSLError: If a SSL error occurs.
+        httpx.TransportError: If a connection, TLS or timeout error occurs.
         Exception: If any unexpected error occurs (logged with traceback).
 
     Notes:
-        - Handles rate limiting (status code 429) with exponential backoff. 
+        - Requests are paced by `limiter`; a 429 pauses every request for TMDB's `Retry-After`,
+          falling back to exponential backoff.
+        - Server errors (status code 5xx) are retried after an exponential backoff.
         - Returns empty list if the movie is not found (status code 404). 
     """
     max_attempts = 3
+    url = endpoint.format(movie_id)
     for tries in range(max_attempts):
         cast_credits = []
         try:
-            response = https_session.get(endpoint.format(movie_id), headers=header, timeout=5)
+            async with semaphore, limiter:
+                response = await client.get(url)
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 casts = data.get('cast', [])
                 for cast in casts:
                     gender = cast.get('gender')
@@ -75,75 +69,75 @@ def fetch_movie_credit(movie_id: int) -> List[Credit]:
                     name = cast.get('name')
                     character_name = cast.get('character')
                     credit_id = cast.get('credit_id')
-                    cast_credits.append(
-                        Credit(
-                            id=credit_id,
-                            movie_id=movie_id,
-                            gender=gender,
-                            person_id=person_id,
-                            name=name,
-                            character_name=character_name
-                        )
-                    )
+                    cast_credits.append({
+                        'id': credit_id,
+                        'movie_id': movie_id,
+                        'gender': gender,
+                        'person_id': person_id,
+                        'name': name,
+                        'character_name': character_name
+                    })
                 if len(cast_credits) == len(casts):
                     return cast_credits
                 else:
                     print(f'Lengths of cast_credits & casts are not equal. Lenghts - {len(cast_credits)}, {len(casts)}')
-            if response.status_code == 429:
+            elif response.status_code >= 500:
+                print(f'TMDB {response.status_code} for Movie ID: {movie_id}, retrying...')
+                await asyncio.sleep((2**tries)+1)
+            elif response.status_code == 429:
                 print(f'Rate Limited for Movie ID: {movie_id}...')
-                time.sleep(2**tries+1)
-            if response.status_code == 404:
+                limiter.pause(retry_after(response.headers, tries))
+            elif response.status_code == 404:
                 print(f'Resource not found for Movie ID - {movie_id}')
                 return []      
             else:
                 print(f'TMDB Exception for [Movie ID:{movie_id}] - {response.status_code} - {response.text}')
-        except requests.exceptions.SSLError as sslerror:
-            print(f'SSLError: {sslerror}')
-            time.sleep(2)
+        except httpx.TransportError as transport_error:
+            print(f'TransportError: {transport_error!r}')
+            await asyncio.sleep(2)
         except Exception as e:
             print(f'[Exception]: {e}')
             traceback.print_exc()
 
-def main() -> None:  
+async def main() -> None:  
     """
     Fetches and saves credits of all the movies in the database.
 
     Workflow:
         1. Retrieves all the movie IDs in the database.
-        2. Fetches credits for each movie in parallel using ThreadPoolExecutor
-        3. Batches and saves the credits in the database in chunks of BATCH_SIZE
+        2. Fetches credits for each movie concurrently on one HTTP/2 client, at most MAX_CONCURRENCY at a time
+        3. Batches the credits in chunks of BATCH_SIZE, committed by a BatchWriter thread while fetching continues
+        4. Rebuilds the precomputed credits payloads served by the API
 
     Notes: 
-        - Skips existing credits to avoid duplication.
-        - Logs progress and errors using tqdm.
+        - Only 4 * MAX_CONCURRENCY fetches are scheduled at a time, not one task per movie.
+        - Existing credits are skipped by the database (ON CONFLICT DO NOTHING).
+        - Logs progress and errors using tqdm, redrawing at most every 200 movies / 0.5s.
     """
     try:
-        movie_ids = [movie.id for movie in db_session.query(MovieID).all()]
-        existing_ids = {credit_id[0] for credit_id in db_session.query(Credit.id).all()}
-        with tqdm(movie_ids, desc='Fetching Movie Credits...') as pbar:
-            max_workers = 60
-            BATCH_SIZE = 1000
-            batch = []
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                futures = [executor.submit(fetch_movie_credit, movie_id) for movie_id in movie_ids]
-                for future in as_completed(futures):
-                    credit_list = future.result()
-                    pbar.update(1)
-                    if credit_list:
-                        new_credits = [credit for credit in credit_list if credit.id not in existing_ids]
-                        existing_ids.update(credit.id for credit in new_credits)
-                        batch.extend(new_credits)
-                    if len(batch) >= BATCH_SIZE:
-                        save_batch(records=batch, session=db_session)
-                        batch.clear() 
-        if batch:   
-            save_batch(records=batch, session=db_session)
-        print(f'Total Credits Inserted {len(existing_ids)}')
+        movie_ids = [movie_id for (movie_id,) in db_session.execute(select(MovieID.id)).yield_per(10000)]
+        BATCH_SIZE = 1000
+        batch = []
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        with BatchWriter() as writer, tqdm(total=len(movie_ids), desc='Fetching Movie Credits...', miniters=200, mininterval=0.5) as pbar:
+            tasks = (fetch_movie_credit(movie_id, semaphore) for movie_id in movie_ids)
+            async for credit_list in as_completed_window(tasks, window=4*MAX_CONCURRENCY):
+                pbar.update(1)
+                if credit_list:
+                    batch.extend(credit_list)
+                if len(batch) >= BATCH_SIZE:
+                    await writer.aput(batch, model=Credit)
+                    batch.clear() 
+            await writer.aput(batch, model=Credit)
+        print(f'Total Credits Inserted {writer.inserted[Credit]}')
+        cached = rebuild_movie_credits_cache(db_session)
+        print(f'Cached credits for {cached} movies')
     except Exception as e:
         print(f'[Exception] - {e}')
         db_session.rollback()
     finally:
         db_session.close()
+        await client.aclose()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
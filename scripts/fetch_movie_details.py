@@ -1,20 +1,19 @@
+import asyncio
 import random
 import os
-import time
 import traceback
-from typing import List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from tqdm import tqdm
 
 from dotenv import load_dotenv
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from requests.exceptions import SSLError
+import httpx
+import orjson
+from sqlalchemy import select
 from db.connect import SessionLocal
 from models.tmdb import Movie, MovieID, MovieGenre
-from utils.db_helpers import save_batch
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils.db_helpers import BatchWriter, save_ids
+from utils.http import as_completed_window, make_tmdb_client, retry_after, tmdb_limiter
 
 db_session = SessionLocal()
 
@@ -25,36 +24,25 @@ if not bearer_token:
 
 endpoint = "https://api.themoviedb.org/3/movie/{}"
 
-header = {
-    "accept": "application/json",
-    "Authorization": f"Bearer {bearer_token}",
-    "User-Agent": "tmdb-fetcher/1.0"
-}
+MAX_CONCURRENCY = 100
+client = make_tmdb_client(bearer_token, MAX_CONCURRENCY)
+limiter = tmdb_limiter()
 
+# IDs still failing after the last attempt, reported at the end of the run
+failed_ids = set()
 
-https_session = requests.Session()
-retries = Retry(
-    total=5,
-    backoff_factor=1,
-    allowed_methods=["HEAD","GET","OPTIONS"],
-    status_forcelist=[429,502,503,504] 
-)
-adapter = HTTPAdapter(max_retries=retries)
-https_session.mount('https://', adapter=adapter)
-
-failed_ids = []
-
-def fetch_data(movie_id: int) -> Optional[Tuple[List[MovieGenre], Movie]]:
+async def fetch_data(movie_id: int, semaphore: asyncio.Semaphore) -> Optional[Tuple[List[Tuple[int, int]], Dict[str, Any]]]:
     """
     Retrieves the movie details and associated genres using Unique ID of the movie.
 
     Args:
         movie_id: Unique ID of the Movie
+        semaphore (asyncio.Semaphore): Caps the number of requests in flight.
 
     Returns:
-        Optional[Tuple[List[MovieGenre]: A tuple containing:
-            - List[MovieGenre]:  Genres to which the movie belongs.
-            - Movie: Serialized Movie object containing fields:
+        Optional[Tuple[List[Tuple[int, int]], Dict[str, Any]]]: A tuple containing:
+            - List[Tuple[int, int]]: `(genre_id, movie_id)` keys of the genres to which the movie belongs.
+            - Dict[str, Any]: Movie row containing fields:
                 - id (int): Movie ID
                 - is_adult (bool): Whether the movie is adult or not.
                 - language (str):  Language of the movie.
@@ -62,119 +50,117 @@ def fetch_data(movie_id: int) -> Optional[Tuple[List[MovieGenre], Movie]]:
                 - overview (str): Plot summary.
                 - poster_path (str): Path of the poster in TMDB.
                 - release_date (str): Date of movie release.
+                - release_year (int): Year of movie release, None if the date is missing.
                 - runtime (int): Runtime of the movie.
                 - title (str): Title of movie in english.
                 - status (str): Status of movie (e.g. - Released, In-Production, etc.).
                 - vote_average (float): Voting average of the movie in TMBD. 
     
     Raises:
-         SSLError: If any SSLError occurs.
+         httpx.TransportError: If a connection, TLS or timeout error occurs.
          Exception: If any unexpected error occurs (logged with traceback).
         
     Notes:
-        - Handles Rate Limiting (status code 429) with exponential backoff.
-        - Returns None if no movie is found (status code 404).
+        - Requests are paced by `limiter`; a 429 pauses every request for TMDB's `Retry-After`,
+          falling back to exponential backoff.
+        - Server errors (status code 5xx) are retried after an exponential backoff.
+        - Returns None if no movie is found (status code 404), or after the last failed attempt
+          (the ID is then added to `failed_ids`).
     """
     max_attempts = 3
+    url = endpoint.format(movie_id)
     for tries in range(max_attempts):
         try:
-            response = https_session.get(endpoint.format(movie_id), headers=header, timeout=5)
+            async with semaphore, limiter:
+                response = await client.get(url)
             if response.status_code == 200:
-                data = response.json()
-                genres = [MovieGenre(genre_id=genre['id'], movie_id=movie_id) for genre in data.get('genres',[])]
-                return genres, Movie(
-                        id=movie_id,
-                        is_adult=data.get('adult', False),
-                        language=data.get('original_language'),
-                        original_title=data.get('original_title'),
-                        overview=data.get('overview'),
-                        poster_path=data.get('poster_path'),
-                        release_date=data.get('release_date'),
-                        runtime=data.get('runtime'),
-                        title=data.get('title'),
-                        status=data.get('status'),
-                        vote_average=data.get('vote_average')
-                ) 
-            if response.status_code == 429:
+                data = orjson.loads(response.content)
+                genres = [(genre['id'], movie_id) for genre in data.get('genres',[])]
+                release_date = data.get('release_date')
+                return genres, {
+                        'id': movie_id,
+                        'is_adult': data.get('adult', False),
+                        'language': data.get('original_language'),
+                        'original_title': data.get('original_title'),
+                        'overview': data.get('overview'),
+                        'poster_path': data.get('poster_path'),
+                        'release_date': release_date,
+                        'release_year': int(release_date[:4]) if release_date else None,
+                        'runtime': data.get('runtime'),
+                        'title': data.get('title'),
+                        'status': data.get('status'),
+                        'vote_average': data.get('vote_average')
+                } 
+            elif response.status_code >= 500:
+                print(f'TMDB {response.status_code} for Movie ID: {movie_id}, retrying...')
+                await asyncio.sleep((2**tries)+1)
+            elif response.status_code == 429:
                 print(f'Rate Limit Exceeded - Movie ID: {movie_id}')
-                time.sleep((2**tries)+1)
-            if response.status_code == 404:
+                limiter.pause(retry_after(response.headers, tries))
+            elif response.status_code == 404:
                 print(f'Resource Not Found for Movie ID: {movie_id}')
+                return None
             else:
                 print(f'[Error] ID: {movie_id}, Status: {response.status_code}')
-                failed_ids.append(movie_id)
-        except SSLError as sslerror:
-            print(f'SSLError for Movie ID: {movie_id}, {sslerror}')
-            time.sleep((2**tries)+1)
+        except httpx.TransportError as transport_error:
+            print(f'TransportError for Movie ID: {movie_id}, {transport_error!r}')
+            await asyncio.sleep((2**tries)+1)
         except Exception as exception:
             print(f'Exception: {exception}')
             traceback.print_exc()
+    failed_ids.add(movie_id)
+    return None
 
-def main():
+async def main():
     """
     Fetches and save the details of the movies in database.
 
     Workflow:
         1. Retrieves the movie IDs in the database.
-        2. Fetches the genres and data of each movie in parallel using ThreadPoolExecutor.
-        3. Batches and saves the data in database in chunks of BATCH_SIZE
+        2. Fetches the genres and data of each movie concurrently on one HTTP/2 client, at most MAX_CONCURRENCY at a time.
+        3. Batches the data in chunks of BATCH_SIZE, committed by a BatchWriter thread while fetching continues
 
     Notes:
-        - Skips existing Movie IDs to avoid duplication.
-        - Logs the progress and errors using tqdm.
+        - Only 4 * MAX_CONCURRENCY fetches are scheduled at a time, not one task per movie.
+        - Existing movies and movie genres are skipped by the database (ON CONFLICT DO NOTHING).
+        - Logs the progress and errors using tqdm, redrawing at most every 200 movies / 0.5s.
     """
     try:
         movies = []
         genres = []
-        max_workers = 60
         BATCH_SIZE = 1000
-        movie_ids = [movie.id for movie in db_session.query(MovieID).all()]
+        movie_ids = [movie_id for (movie_id,) in db_session.execute(select(MovieID.id)).yield_per(10000)]
         random.shuffle(movie_ids)
-        existing_movie_ids = set(db_session.query(Movie.id).all())
-        existing_movie_genres = set(db_session.query(MovieGenre.genre_id, MovieGenre.movie_id).all())
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            with tqdm(total=len(movie_ids), desc='Fetching Movie Details....') as pbar:
-                futures = [executor.submit(fetch_data, id) for id in movie_ids]
-                for future in as_completed(futures):
-                    result = future.result()
-                    if result is None:
-                        continue
-
-                    movie_genres, movie = result
-                    if movie and movie.id not in existing_movie_ids:
-                        existing_movie_ids.add(movie.id)
-                        movies.append(movie)
-
-                        new_genres = [
-                                movie_genre for movie_genre in movie_genres 
-                                if (movie_genre.genre_id, movie_genre.movie_id) not in existing_movie_genres
-                            ]
-                        
-                        if new_genres:
-                            genres.extend(new_genres)
-                            existing_movie_genres.update((movie_genre.genre_id, movie_genre.movie_id) for movie_genre in new_genres)
-
-                    if len(movies) >= BATCH_SIZE:
-                        save_batch(records=movies, session=db_session)
-                        movies.clear()
-                    if len(genres) >= BATCH_SIZE:
-                        save_batch(records=genres, session=db_session)
-                        genres.clear()
-                    pbar.update(1)
-        if movies:
-            save_batch(records=movies, session=db_session)
-            movies.clear()
-        if genres:
-            save_batch(records=genres, session=db_session)
-            genres.clear()
-        print(f'Number of Movie Details uploaded: {len(existing_movie_ids)}')       
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        with BatchWriter() as writer, tqdm(total=len(movie_ids), desc='Fetching Movie Details....', miniters=200, mininterval=0.5) as pbar:
+            tasks = (fetch_data(id, semaphore) for id in movie_ids)
+            async for result in as_completed_window(tasks, window=4*MAX_CONCURRENCY):
+                pbar.update(1)
+                if result is None:
+                    continue
+
+                movie_genres, movie = result
+                if movie:
+                    movies.append(movie)
+                    genres.extend(movie_genres)
+
+                if len(movies) >= BATCH_SIZE:
+                    await writer.aput(movies, model=Movie)
+                    movies.clear()
+                if len(genres) >= BATCH_SIZE:
+                    await writer.aput(genres, model=MovieGenre, save=save_ids)
+                    genres.clear()
+            await writer.aput(movies, model=Movie)
+            await writer.aput(genres, model=MovieGenre, save=save_ids)
+        print(f'Number of Movie Details uploaded: {writer.inserted[Movie]}')       
     except Exception as exception:
         print(f'[EXCEPTION]: {exception}')
         db_session.rollback()
     finally:
         db_session.close()
+        await client.aclose()
     if failed_ids:
-        print(f'Failed IDs: {failed_ids}, retry them....')
+        print(f'Failed IDs: {sorted(failed_ids)}, retry them....')
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -1,29 +1,20 @@
+import asyncio
 import os
-import time
 import traceback
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 from tqdm import tqdm
 
 from dotenv import load_dotenv
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import httpx
+import orjson
+from sqlalchemy import select
 from db.connect import SessionLocal
-from models.tmdb import MovieID, Genre
-from utils.db_helpers import save_batch
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from models.tmdb import MovieID, Genre, ResponseETag
+from utils.db_helpers import BatchWriter, save_etags, save_ids
+from utils.http import as_completed_window, make_tmdb_client, retry_after, tmdb_limiter
 
 db_session = SessionLocal()
-https_session = requests.Session()
-retries = Retry(
-    total=5,
-    backoff_factor=1,
-    allowed_methods={"HEAD", "GET", "OPTIONS"},
-    status_forcelist=[429,502,503,504]
-)
-adapter = HTTPAdapter(max_retries=retries)
-https_session.mount('https://', adapter=adapter)
 
 load_dotenv()
 bearer_token = os.getenv("BEARER_TOKEN")
@@ -32,13 +23,17 @@ if not bearer_token:
 
 endpoint = "https://api.themoviedb.org/3/discover/movie?primary_release_year={}&with_genres={}&page={}"
 
-header = {
-    "accept": "application/json",
-    "Authorization": f"Bearer {bearer_token}",
-    "User-Agent": "tmdb-fetcher/1.0"
-}
+MAX_CONCURRENCY = 100
+client = make_tmdb_client(bearer_token, MAX_CONCURRENCY)
+limiter = tmdb_limiter()
 
-def fetch_page(year, genre, page) -> List[int]:
+# ETag of every discover page fetched by a previous run, loaded in `main`
+etags: Dict[str, str] = {}
+
+# TMDB's discover endpoint serves at most 500 pages per query
+MAX_PAGES = 500
+
+async def fetch_page(year, genre, page, semaphore: asyncio.Semaphore) -> Tuple[List[int], Optional[Dict[str, str]], Optional[int]]:
     """
     Fetches the Movie IDs from a particular year, all the genres and pages from TMDB
 
@@ -46,101 +41,129 @@ def fetch_page(year, genre, page) -> List[int]:
         year (int): Year of the movie
         genre (string): TMDB Genre ID
         page (int): Page Number (Page starts from 1, max limit is 500)
+        semaphore (asyncio.Semaphore): Caps the number of requests in flight.
 
     Returns:
-        List[int]: List containing the movie IDs from a particular page, genre and year.
+        Tuple[List[int], Optional[Dict[str, str]], Optional[int]]: A tuple containing:
+            - List[int]: Movie IDs from a particular page, genre and year.
+            - Optional[Dict[str, str]]: ResponseETag row (`url`, `etag`) of the page, None if TMDB sent no ETag.
+            - Optional[int]: `total_pages` of the (year, genre) query, 0 if it has no results,
+              None if unknown (unchanged page or failed request).
     
     Raises:
-        SSLError: If any SSLError occurs.
+        httpx.TransportError: If a connection, TLS or timeout error occurs.
         Exception: If any unexpected exception occurs (logged with traceback).
 
     Notes:
-        - Handles rate limiting (status code 429) using exponential backoff.
+        - Requests are paced by `limiter`; a 429 pauses every request for TMDB's `Retry-After`,
+          falling back to exponential backoff.
+        - Server errors (status code 5xx) are retried after an exponential backoff.
+        - Sends the page's stored ETag as `If-None-Match`; an unchanged page (status code 304)
+          returns no IDs, they were saved by the run that stored the ETag. Page 1 is always
+          downloaded, its `total_pages` decides which other pages are fetched.
         - Returns empty list if no movies are found (status code 404).
 
     """
-    tries = 0
     max_tries = 3
+    url = endpoint.format(year, genre, page)
+    headers = {'If-None-Match': etags[url]} if page > 1 and url in etags else None
     for tries in range(max_tries):
         try:
-            url = endpoint.format(year, genre, page)
-            response = https_session.get(url=url, headers=header, timeout=5)
+            async with semaphore, limiter:
+                response = await client.get(url, headers=headers)
             if response.status_code == 200:
-                    movies = response.json().get('results', [])
-                    if not movies:
-                         return []
-                    return [movie['id'] for movie in movies]
+                    etag = response.headers.get('ETag')
+                    data = orjson.loads(response.content)
+                    movies = data.get('results', [])
+                    return [movie['id'] for movie in movies], {'url': url, 'etag': etag} if etag else None, data.get('total_pages')
+            if response.status_code == 304:
+                    return [], None, None
+            if response.status_code >= 500:
+                print(f'TMDB {response.status_code} on page: {page}, retrying...')
+                await asyncio.sleep((2**tries)+1)
+                continue
             if response.status_code == 429:
                     print(f'Rate limited on page: {page}, backing off...')
-                    time.sleep((2**tries)+1)
+                    limiter.pause(retry_after(response.headers, tries))
                     continue
             if response.status_code == 404:
                 print(f"Resource Not Found for Year: {year}, Genre: {genre}, and Page: {page}")
-                return []
+                return [], None, 0
             else:
                 print(f'TMDB Exception: {response.status_code} - {response.text}')
-                return []
-        except requests.exceptions.SSLError as sslerror:
-            print(f'[SSLError]: {sslerror}')
-            time.sleep((2**tries)+1)
+                return [], None, None
+        except httpx.TransportError as transport_error:
+            print(f'[TransportError]: {transport_error!r}')
+            await asyncio.sleep((2**tries)+1)
         except Exception as e:
             print(f"[Exception]: {e}")
             traceback.print_exc()
+    return [], None, None
 
-def main():
+async def main():
     """
     Fetches and saves the movie IDs for all genres and years.
 
     Workflow:
         1. Retrieves all then genre IDs from the database.
-        2. Fetches movie IDs for each genre, year and page in parallel using ThreadPoolExecutor.
-        3. Batches and saves the IDs in database in chunks of BATCH_SIZE.
+        2. Fetches page 1 of every (year, genre) to read its `total_pages`.
+        3. Fetches movie IDs for the remaining existing pages as one pool of tasks on one HTTP/2 client, at most MAX_CONCURRENCY at a time.
+        4. Batches the IDs in chunks of BATCH_SIZE, bulk loaded (see `save_ids`) by a BatchWriter thread while fetching continues.
+        5. Stores the ETag of each fetched page, queued after the IDs of that page so it is never saved without them.
 
     Notes:
-        - Skips existing movie IDs to avoid duplication.
-        - Logs progress and errors using tqdm.
+        - All pages share one queue, so a slow (year, genre) pair never holds back the next one.
+        - Pages past `total_pages` are never requested; if page 1 fails, all MAX_PAGES pages are tried.
+        - Existing movie IDs are skipped by the database (ON CONFLICT DO NOTHING).
+        - Logs progress and errors using tqdm, redrawing at most every 200 pages / 0.5s.
     """
-    GENRES = {genre.id:genre.name for genre in db_session.query(Genre).all()}
-    GENRE_IDS = list(GENRES.keys())
+    GENRE_IDS = list(db_session.scalars(select(Genre.id)))
     START_YEAR = 2021
     END_YEAR = 2022
-    TOTAL = (END_YEAR-START_YEAR)*len(GENRE_IDS)*500
-    new_movies_count = 0
+    PAIRS = [(year, genre) for year in range(START_YEAR, END_YEAR) for genre in GENRE_IDS]
     try:
-        BATCH_SIZE = 5000
+        etags.update((url, etag) for url, etag in db_session.execute(select(ResponseETag.url, ResponseETag.etag)).yield_per(10000))
+        BATCH_SIZE = 2000
         movies_ids = []
-        existing_ids = {_id[0] for _id in db_session.query(MovieID.id).all()}
-
-        with tqdm(total=TOTAL, desc=f"Fetching Movies from {START_YEAR} to {END_YEAR}") as pbar:
-            for year in range(START_YEAR, END_YEAR):
-                for genre in GENRE_IDS:
-                    workers = 50
-                    new_movies = []
-                    with ThreadPoolExecutor(max_workers=workers) as executor:
-                        futures = [executor.submit(fetch_page, year, genre, page) for page in range(1, 501)]
-                        for future in as_completed(futures):
-                            movies = future.result()
-                            pbar.update(1)
-                            if movies:
-                                new_movies = [movie_id for movie_id in movies if movie_id not in existing_ids]
-                                new_movies_count += len(new_movies)
-                                existing_ids.update(new_movies)
-                                movies_ids.extend(MovieID(id=movie_id) for movie_id in new_movies)
-                            if len(movies_ids) >= BATCH_SIZE:
-                                tqdm.write(f'Commiting a batch in Database')
-                                save_batch(records=movies_ids, session=db_session)
-                                movies_ids.clear() 
-                    tqdm.write(f"Completed batch for {year}-{GENRES[genre]}")
+        page_etags = []
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+
+        # Page 1 of each (year, genre) carries its total_pages, so only existing pages are queued
+        first_pages = await asyncio.gather(*(fetch_page(year, genre, 1, semaphore) for year, genre in PAIRS))
+        PAGES = [
+            (year, genre, page)
+            for (year, genre), (_, _, total_pages) in zip(PAIRS, first_pages)
+            for page in range(2, min(MAX_PAGES if total_pages is None else total_pages, MAX_PAGES)+1)
+        ]
+        for movies, etag, _ in first_pages:
+            movies_ids.extend(movies)
+            if etag:
+                page_etags.append(etag)
+        print(f'{len(PAIRS) + len(PAGES)} pages to fetch for {len(PAIRS)} (year, genre) pairs')
+
+        with BatchWriter() as writer, tqdm(total=len(PAGES), desc=f"Fetching Movies from {START_YEAR} to {END_YEAR}", miniters=200, mininterval=0.5) as pbar:
+            tasks = (fetch_page(year, genre, page, semaphore) for year, genre, page in PAGES)
+            async for movies, etag, _ in as_completed_window(tasks, window=4*MAX_CONCURRENCY):
+                pbar.update(1)
+                if movies:
+                    movies_ids.extend(movies)
+                if etag:
+                    page_etags.append(etag)
+                if len(movies_ids) >= BATCH_SIZE:
+                    await writer.aput(movies_ids, model=MovieID, save=save_ids)
+                    await writer.aput(page_etags, model=ResponseETag, save=save_etags)
+                    movies_ids.clear() 
+                    page_etags.clear()
             tqdm.write(f"Committing the data in Database")
-            if movies_ids: 
-                save_batch(records=movies_ids, session=db_session)
-                movies_ids.clear()
-            tqdm.write(f"Total {new_movies_count} New Movie IDs pushed to DB.")
+            await writer.aput(movies_ids, model=MovieID, save=save_ids)
+            await writer.aput(page_etags, model=ResponseETag, save=save_etags)
+        tqdm.write(f"Total {writer.inserted[MovieID]} New Movie IDs pushed to DB.")
     except Exception as e:
         print(f"Exception Occured: {e}")
         db_session.rollback()
     finally:
         db_session.close()
+        await client.aclose()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
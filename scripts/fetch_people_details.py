@@ -1,18 +1,16 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import json
+import asyncio
 import os
-from threading import Lock
-import time
-from typing import Optional
+import traceback
+from typing import Any, Dict, Optional
 
 from dotenv import load_dotenv
-import requests
-from requests.adapters import HTTPAdapter
-from requests.exceptions import SSLError
-from urllib3.util.retry import Retry
+import httpx
+import orjson
+from sqlalchemy import select
 from models.tmdb import Credit, People
 from db.connect import SessionLocal
-from utils.db_helpers import save_batch
+from utils.db_helpers import BatchWriter
+from utils.http import as_completed_window, make_tmdb_client, retry_after, tmdb_limiter
 
 from tqdm import tqdm
 
@@ -22,44 +20,31 @@ bearer_token = os.getenv('BEARER_TOKEN')
 if not bearer_token:
     raise ValueError("BEARER_TOKEN not found in .env file")
 
-header = {
-    'accept': 'Application/json',
-    'Authorization': f"Bearer {bearer_token}",
-    "User-Agent": "tmdb-fetcher/1.0"
-}
+endpoint = "https://api.themoviedb.org/3/person/{}"
 
-https_session = requests.Session()
-retries = Retry(
-    total=5,
-    backoff_factor=1,
-    allowed_methods={"HEAD","GET","OPTIONS"},
-    status_forcelist=[429,502,503,504]
-)
+MAX_CONCURRENCY = 100
+client = make_tmdb_client(bearer_token, MAX_CONCURRENCY)
+limiter = tmdb_limiter()
 
-adapter = HTTPAdapter(max_retries=retries)
-https_session.mount('https://', adapter=adapter)
+# IDs still failing after the last attempt, reported at the end of the run
+failed_ids = set()
 
-failed_ids = []
-lock = Lock()
+# TMDB gender codes 0-3, indexed by code
+GENDERS = ('Not Specified', 'Female', 'Male', 'Non-Binary')
 
 def get_gender(gender:int) -> str:
-    gender_map = {
-        0:'Not Specified',
-        1:'Female',
-        2:'Male',
-        3:'Non-Binary'
-    }
-    return gender_map.get(gender, 'Not Specified')
-
-def fetch_people_data(people_id: int) -> Optional[People]:
+    return GENDERS[gender] if gender in range(len(GENDERS)) else GENDERS[0]
+
+async def fetch_people_data(people_id: int, semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
     """
     Fetches the details of the Cast using Unique ID of the person.
 
     Args:
         people_id (int): Unique ID of the cast in TMDB.
+        semaphore (asyncio.Semaphore): Caps the number of requests in flight.
 
     Returns:
-        Optional[People]: Object of the People having fields:
+        Optional[Dict[str, Any]]: People row having fields:
             - id (int): TMDB people ID.
             - is_adult (bool): Whether the cast is adult.
             - alias (list[str]): Other names of the Cast.
@@ -71,93 +56,97 @@ def fetch_people_data(people_id: int) -> Optional[People]:
             - profile_path (str): Path of person's profile in TMDB.
 
     Raises: 
-        SSLError: If any SSLError occurs.
-        Exception: If any unexpected exception occurs.
+        httpx.TransportError: If a connection, TLS or timeout error occurs.
+        Exception: If any unexpected exception occurs (logged with traceback).
 
     Notes:
-        - Handles rate limiting (status code 429) with exponential backoff.
-        - Returns None if the person is not found (status code 404).
+        - Requests are paced by `limiter`; a 429 pauses every request for TMDB's `Retry-After`,
+          falling back to exponential backoff.
+        - Server errors (status code 5xx) are retried after an exponential backoff.
+        - Returns None if the person is not found (status code 404), or after the last failed attempt
+          (the ID is then added to `failed_ids`).
     """
     max_tries = 3
+    url = endpoint.format(people_id)
     for tries in range(max_tries):
         try:
-            endpoint = "https://api.themoviedb.org/3/person/{}"
-            response = https_session.get(url=endpoint.format(people_id), timeout=5, headers=header)
+            async with semaphore, limiter:
+                response = await client.get(url)
             if response.status_code == 200:
-                data = response.json()
-                return People(
-                    id=people_id,
-                    is_adult=data.get('adult'),
-                    alias=json.dumps(data.get('also_known_as', []), ensure_ascii=False),
-                    biography=data.get('biography'),
-                    birthday=data.get('birthday'),
-                    gender=get_gender(data.get('gender', 0)),
-                    name=data.get('name'),
-                    place_of_birth=data.get('place_of_birth'),
-                    profile_path=data.get('profile_path')
-                )
-            if response.status_code == 404:
+                data = orjson.loads(response.content)
+                return {
+                    'id': people_id,
+                    'is_adult': data.get('adult'),
+                    'alias': data.get('also_known_as', []),
+                    'biography': data.get('biography'),
+                    'birthday': data.get('birthday'),
+                    'gender': get_gender(data.get('gender', 0)),
+                    'name': data.get('name'),
+                    'place_of_birth': data.get('place_of_birth'),
+                    'profile_path': data.get('profile_path')
+                }
+            elif response.status_code == 404:
                 print(f'Resource not found for People ID: {people_id}')
                 return None
-            if response.status_code == 429:
+            elif response.status_code >= 500:
+                print(f'TMDB {response.status_code} for People ID: {people_id}, retrying...')
+                await asyncio.sleep((2**tries)+1)
+            elif response.status_code == 429:
                 print(f'Rate Limited for People ID: {people_id}')
-                time.sleep((2**tries)+1)
+                limiter.pause(retry_after(response.headers, tries))
             else:
                 print(f'Error at People ID: {people_id} - {response.text} - {response.status_code}')
-                with lock:
-                    failed_ids.append(people_id)
-                time.sleep(1)
-        except SSLError as sslerror:
-            print(f'SSLError at People ID: {people_id}  - {sslerror}')
-            time.sleep((2**tries)+1)
+                await asyncio.sleep(1)
+        except httpx.TransportError as transport_error:
+            print(f'TransportError at People ID: {people_id} - {transport_error!r}')
+            await asyncio.sleep((2**tries)+1)
         except Exception as e:
             print(f'[Exception]: {e}')
+            traceback.print_exc()
+    failed_ids.add(people_id)
     return None
 
-def main() -> None:
+async def main() -> None:
     """
     Fetches and saves the person information in the database.
 
     Workflow:
-        1. Retrieves all the unique person IDs from database.
-        2. Fetches the details of people in parallel using ThreadPoolExecutor.
-        3. Batches and saves the people data in chunks of BATCH_SIZE in database.
+        1. Retrieves the credited person IDs that are not in the People table yet.
+        2. Fetches the details of people concurrently on one HTTP/2 client, at most MAX_CONCURRENCY at a time.
+        3. Batches the people data in chunks of BATCH_SIZE, committed by a BatchWriter thread while fetching continues.
 
     Notes:
-        - Skips existing person ID to avoid duplication.
-        - Logs progress and errors using tqdm.
+        - Only 4 * MAX_CONCURRENCY fetches are scheduled at a time, not one task per person.
+        - Existing people are excluded by an `EXCEPT` in SQLite, so they are never fetched.
+        - Logs progress and errors using tqdm, redrawing at most every 200 people / 0.5s.
     """
     db_session = SessionLocal()
     try:
-        max_workers = 100
-        people_ids = [id[0] for id in db_session.query(Credit.person_id).distinct()]
-        existing_people_ids = {id[0] for id in db_session.query(People.id).all()}
+        missing_people = select(Credit.person_id).where(Credit.person_id.is_not(None)).except_(select(People.id))
+        people_ids = [person_id for (person_id,) in db_session.execute(missing_people).yield_per(10000)]
         peoples_list = []
-        BATCH_SIZE = 10000
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            with tqdm(total=len(people_ids), desc='Fetching People Details...') as pbar:
-                futures = [executor.submit(fetch_people_data, pid) for pid in people_ids]
-                for future in as_completed(futures):
-                    people = future.result()
-                    pbar.update(1)
-                    if people and people.id not in existing_people_ids:
-                        existing_people_ids.add(people.id)
-                        peoples_list.append(people)
-                    if len(peoples_list) >= BATCH_SIZE:
-                        tqdm.write(f'Inserting {len(peoples_list)} people data into DB')
-                        save_batch(peoples_list, session=db_session)
-                        peoples_list.clear()
-                if peoples_list:
-                        tqdm.write(f'Inserting remaining people data into DB')
-                        save_batch(records=peoples_list, session=db_session)
-        print(f'Total People Fetched: {len(existing_people_ids)}')
+        BATCH_SIZE = 1000
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        with BatchWriter() as writer, tqdm(total=len(people_ids), desc='Fetching People Details...', miniters=200, mininterval=0.5) as pbar:
+            tasks = (fetch_people_data(pid, semaphore) for pid in people_ids)
+            async for people in as_completed_window(tasks, window=4*MAX_CONCURRENCY):
+                pbar.update(1)
+                if people:
+                    peoples_list.append(people)
+                if len(peoples_list) >= BATCH_SIZE:
+                    tqdm.write(f'Inserting {len(peoples_list)} people data into DB')
+                    await writer.aput(peoples_list, model=People)
+                    peoples_list.clear()
+            await writer.aput(peoples_list, model=People)
+        print(f'Total People Fetched: {writer.inserted[People]}')
         if failed_ids:
-            print(f'Retry for Failed IDs: {failed_ids}')
+            print(f'Retry for Failed IDs: {sorted(failed_ids)}')
     except Exception as e:
         db_session.rollback()
         print(f'[Exception]: {e}')
     finally:
         db_session.close()
+        await client.aclose()
         
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,16 @@
+import models.tmdb  # noqa: F401 - registers the models on Base
+from db.connect import init_db
+
+def main() -> None:
+    """
+    Creates the missing tables and the FTS index once, before the first ingest.
+
+    Notes:
+        - The fetch scripts never create tables on import, run this (or `alembic upgrade head`)
+          on a fresh database instead.
+    """
+    init_db()
+    print('Database schema initialized')
+
+if __name__ == "__main__":
+    main()
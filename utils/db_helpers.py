@@ -1,36 +1,244 @@
-import time
-from typing import Any, Sequence
-from sqlalchemy.exc import OperationalError, SQLAlchemyError
+import asyncio
+from collections import defaultdict
+from functools import lru_cache
+from itertools import groupby
+from queue import Queue
+from threading import Thread
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple, Type, Union
+import orjson
+from sqlalchemy import delete, insert, literal_column, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
+from db.connect import Base, SessionLocal
+from models.tmdb import Credit, DataVersion, MovieCreditsCache, ResponseETag
 
-def save_batch(records: Sequence[Any], session: Session, max_attempts: int=5) -> None:
+CREDIT_FIELDS = ('id', 'movie_id', 'gender', 'person_id', 'name', 'character_name')
+
+@lru_cache(maxsize=None)
+def insert_ignore(model: Type[Base]):
+    """
+    Returns the `INSERT ... ON CONFLICT DO NOTHING` statement of `model`, built once per model.
+
+    Notes:
+        - Reusing the same statement object hits the engine's compiled cache on every
+          batch, so executing it only binds parameters.
+    """
+    return sqlite_insert(model.__table__).on_conflict_do_nothing()
+
+def bump_data_version(session: Session) -> None:
+    """
+    Increments the dataset version read by the API, within the caller's transaction.
+
+    Notes:
+        - The API derives its ETags and cached totals from this row (see `backend.cache`),
+          so every commit that changes served data must call this before committing.
+    """
+    stmt = sqlite_insert(DataVersion.__table__).values(id=1, version=1)
+    stmt = stmt.on_conflict_do_update(index_elements=['id'], set_={'version': DataVersion.version + 1})
+    session.connection().execute(stmt)
+
+def save_batch(records: Sequence[Dict[str, Any]], session: Session, model: Type[Base]) -> int:
+    """
+    Inserts a batch of records and commits.
+
+    Args:
+        records (Sequence[Dict]): Column dicts of `model`
+        session (Session): SQLAlchemy database session
+        model (Base): Model the dicts are inserted into
+
+    Returns:
+        int: Number of rows inserted
+
+    Notes:
+        - Dicts go through a Core `INSERT ... ON CONFLICT DO NOTHING` executemany, which
+          skips the ORM unit of work and lets the database drop rows it already has,
+          so callers do not need to track existing primary keys.
+        - A locked database is waited out by SQLite's `busy_timeout` (see `SQLITE_PRAGMAS`),
+          so there is no retry loop here.
+    """
     if not records:
         print(f'No Records to insert into Database')
-        return
-    
-    for attempts in range(1, max_attempts+1):
+        return 0
+    try:
+        inserted = session.connection().execute(insert_ignore(model), records).rowcount
+        if inserted:
+            bump_data_version(session)
+        session.commit()
+    except SQLAlchemyError as e:
+        print(f'SQLAlchemy Error: {e}')
+        session.rollback()
+        raise
+    return inserted
+
+def save_ids(ids: Sequence[Union[int, Tuple[int, ...]]], session: Session, model: Type[Base]) -> int:
+    """
+    Bulk loads a batch of IDs into a key-only table (e.g. `movie_ids`, `movie_genre`) and commits.
+
+    Args:
+        ids (Sequence): IDs to insert, or primary key tuples in column order for a
+            composite key (e.g. `(genre_id, movie_id)`); existing ones are skipped
+        session (Session): SQLAlchemy database session
+        model (Base): Model of the table, its primary key columns are the only ones written
+
+    Returns:
+        int: Number of IDs inserted
+
+    Notes:
+        - Hands plain tuples straight to the DBAPI cursor's `executemany`, skipping
+          SQLAlchemy's statement and parameter processing; SQLite's nearest equivalent
+          of a `COPY` load.
+    """
+    if not ids:
+        return 0
+    table = model.__table__
+    columns = [column.name for column in table.primary_key.columns]
+    stmt = f"INSERT OR IGNORE INTO {table.name} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+    rows = ids if len(columns) > 1 else ((id,) for id in ids)
+    try:
+        cursor = session.connection().connection.cursor()
+        cursor.executemany(stmt, rows)
+        inserted = cursor.rowcount
+        cursor.close()
+        if inserted:
+            bump_data_version(session)
+        session.commit()
+    except Exception as e:
+        # Raw DBAPI errors (sqlite3.Error) are not wrapped in SQLAlchemyError here
+        print(f'Exception: {e}')
+        session.rollback()
+        raise
+    return inserted
+
+def save_etags(records: Sequence[Dict[str, str]], session: Session, model: Type[Base]=ResponseETag) -> int:
+    """
+    Stores the latest ETag of each TMDB URL and commits.
+
+    Args:
+        records (Sequence[Dict]): `{'url': ..., 'etag': ...}` rows
+        session (Session): SQLAlchemy database session
+        model (Base): ETag table, `ResponseETag` by default
+
+    Returns:
+        int: Number of URLs written
+
+    Notes:
+        - Unlike `save_batch`, a URL that is already stored gets its ETag replaced.
+    """
+    if not records:
+        return 0
+    stmt = sqlite_insert(model.__table__)
+    stmt = stmt.on_conflict_do_update(index_elements=['url'], set_={'etag': stmt.excluded.etag})
+    try:
+        written = session.connection().execute(stmt, records).rowcount
+        session.commit()
+    except SQLAlchemyError as e:
+        print(f'SQLAlchemy Error: {e}')
+        session.rollback()
+        raise
+    return written
+
+def rebuild_movie_credits_cache(session: Session, batch_size: int=1000) -> int:
+    """
+    Rebuilds the `movie_credits_cache` table with the serialized credit list of every movie.
+
+    Args:
+        session (Session): SQLAlchemy database session
+        batch_size (int): Number of movie payloads inserted per statement
+
+    Returns:
+        int: Number of movies cached
+
+    Notes:
+        - Each payload is the exact JSON body of `/movies/{movie_id}/credits/`, so the
+          endpoint can return it without querying or serializing the credits.
+        - Credits keep their insertion (billing) order within a movie.
+        - Runs in a single transaction, the old cache stays readable until it commits.
+    """
+    stmt = select(*(getattr(Credit, field) for field in CREDIT_FIELDS))\
+            .order_by(Credit.movie_id, literal_column('credit.rowid'))
+    cached = 0
+    batch = []
+    try:
+        session.execute(delete(MovieCreditsCache))
+        rows = session.execute(stmt).yield_per(10000)
+        for movie_id, credits in groupby(rows, key=lambda row: row.movie_id):
+            payload = orjson.dumps([row._asdict() for row in credits]).decode()
+            batch.append({'movie_id': movie_id, 'payload': payload})
+            if len(batch) >= batch_size:
+                session.execute(insert(MovieCreditsCache), batch)
+                cached += len(batch)
+                batch.clear()
+        if batch:
+            session.execute(insert(MovieCreditsCache), batch)
+            cached += len(batch)
+        bump_data_version(session)
+        session.commit()
+    except SQLAlchemyError as e:
+        print(f'SQLAlchemy Error: {e}')
+        session.rollback()
+        raise
+    return cached
+
+class BatchWriter:
+    """
+    Commits batches on a dedicated thread, so fetching continues while the database writes.
+
+    Usage:
+        with BatchWriter() as writer:
+            await writer.aput(batch, model=Credit)  # writer.put(...) from synchronous code
+        print(writer.inserted[Credit])
+
+    Notes:
+        - The queue holds at most `maxsize` batches; `put`/`aput` wait when the writer falls
+          behind, which throttles the fetchers instead of buffering without bound.
+        - The thread uses its own session, the caller's session is never shared across threads.
+        - A failed batch stops further writes; the error is raised again when the block exits.
+    """
+    def __init__(self, maxsize: int=4) -> None:
+        self.queue: Queue = Queue(maxsize=maxsize)
+        self.inserted: Dict[Type[Base], int] = defaultdict(int)
+        self.error: Optional[BaseException] = None
+        self.thread = Thread(target=self._run, name='batch-writer', daemon=True)
+
+    def __enter__(self) -> 'BatchWriter':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def put(self, records: Sequence[Any], model: Type[Base], save: Callable[..., int]=save_batch) -> None:
+        """
+        Queues a copy of `records` to be written with `save(records, session, model)`.
+        """
+        if records:
+            self.queue.put((list(records), model, save))
+
+    async def aput(self, records: Sequence[Any], model: Type[Base], save: Callable[..., int]=save_batch) -> None:
+        """
+        Async `put` for fetchers running on an event loop.
+
+        Notes:
+            - Waiting for room in a full queue happens on a worker thread, so the
+              in-flight requests keep running while the writer catches up.
+        """
+        if records:
+            await asyncio.to_thread(self.queue.put, (list(records), model, save))
+
+    def _run(self) -> None:
+        session = SessionLocal()
         try:
-            session.bulk_save_objects(records)
-            session.commit()
-            return
-        except OperationalError as e:
-            if 'database is locked' in str(e):
-                print(f'Database is locked, retrying commit ({attempts}/{max_attempts})')
-                time.sleep((2**attempts)+1)
-                continue
-            else:
-                print(f'Operational Error (non-lock): {e}')
-                session.rollback()
-                raise
-        except SQLAlchemyError as e:
-            print(f'SQLAlchemy Error: {e}')
-            session.rollback()
-            raise
-        except Exception as e:
-            print(f'Exception: {e}')
-            session.rollback()
-            raise
+            while (item := self.queue.get()) is not None:
+                if self.error is not None:
+                    continue
+                records, model, save = item
+                try:
+                    self.inserted[model] += save(records, session=session, model=model)
+                except BaseException as e:
+                    self.error = e
         finally:
-            if attempts == max_attempts:
-                session.close()
-    print('[Failed to commit records in Database]')
\ No newline at end of file
+            session.close()
@@ -0,0 +1,117 @@
+import asyncio
+from functools import lru_cache
+from itertools import islice
+from typing import AsyncIterator, Awaitable, Iterable, Mapping, TypeVar
+from aiolimiter import AsyncLimiter
+import httpx
+
+T = TypeVar('T')
+
+# TMDB allows roughly 40 requests per second per client
+TMDB_RATE_LIMIT = 40
+
+def make_tmdb_client(token: str, max_concurrency: int) -> httpx.AsyncClient:
+    """
+    Builds the HTTP/2 client shared by every request of a fetch script.
+
+    Args:
+        token (str): TMDB API read access token, sent as a Bearer token
+        max_concurrency (int): Maximum number of (keep-alive) connections in the pool
+
+    Returns:
+        httpx.AsyncClient: Client with TMDB's headers, a 5s timeout and 5 connection retries
+    """
+    return httpx.AsyncClient(
+        headers={
+            "accept": "application/json",
+            "Authorization": f"Bearer {token}",
+            "User-Agent": "tmdb-fetcher/1.0"
+        },
+        timeout=5,
+        transport=httpx.AsyncHTTPTransport(
+            http2=True,
+            retries=5,
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        )
+    )
+
+class TMDBLimiter:
+    """
+    Async context manager pacing requests to `rate` per `period` seconds, which any request can pause.
+
+    Notes:
+        - Entering waits out an active pause before taking a slot of the AsyncLimiter, so a 429
+          stops every in-flight fetcher instead of only the request that received it.
+    """
+    def __init__(self, rate: float, period: float = 1) -> None:
+        self.limiter = AsyncLimiter(rate, period)
+        self.paused_until = 0.0
+
+    def pause(self, seconds: float) -> None:
+        """
+        Holds back every request entering the limiter for the next `seconds`.
+
+        Args:
+            seconds (float): Pause length, e.g. from `retry_after`; an already longer pause is kept
+        """
+        self.paused_until = max(self.paused_until, asyncio.get_running_loop().time() + seconds)
+
+    async def __aenter__(self) -> None:
+        loop = asyncio.get_running_loop()
+        while (delay := self.paused_until - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        await self.limiter.acquire()
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+@lru_cache(maxsize=None)
+def tmdb_limiter() -> TMDBLimiter:
+    """
+    Returns the rate limiter shared by every TMDB request of the process.
+
+    Notes:
+        - Built once, so all requests stay under TMDB_RATE_LIMIT together instead of hitting 429s,
+          and a pause after a 429 applies to all of them.
+    """
+    return TMDBLimiter(TMDB_RATE_LIMIT, 1)
+
+def retry_after(headers: Mapping[str, str], tries: int) -> float:
+    """
+    Returns how long to wait before retrying a rate limited (status code 429) request.
+
+    Args:
+        headers (Mapping[str, str]): Headers of the 429 response
+        tries (int): Attempt number starting from 0, used by the fallback backoff
+
+    Returns:
+        float: Seconds from the `Retry-After` header, or `2**tries + 1` if TMDB did not send it
+    """
+    try:
+        return max(float(headers.get('Retry-After')), 0)
+    except (TypeError, ValueError):
+        return (2**tries)+1
+
+async def as_completed_window(awaitables: Iterable[Awaitable[T]], window: int) -> AsyncIterator[T]:
+    """
+    Runs awaitables with at most `window` of them scheduled at once, yielding results as they finish.
+
+    Args:
+        awaitables (Iterable[Awaitable]): Lazily produced awaitables (e.g. a generator of coroutines)
+        window (int): Maximum number of tasks alive at the same time
+
+    Yields:
+        T: Result of each awaitable, in completion order
+
+    Notes:
+        - A new awaitable is only pulled from `awaitables` when one finishes, so memory
+          stays O(window) instead of one task per movie.
+    """
+    awaitables = iter(awaitables)
+    pending = {asyncio.ensure_future(awaitable) for awaitable in islice(awaitables, window)}
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for awaitable in islice(awaitables, len(done)):
+            pending.add(asyncio.ensure_future(awaitable))
+        for task in done:
+            yield task.result()